@@ -0,0 +1,226 @@
+import random
+
+import numpy as np
+
+from scheduler import FCFSScheduler, PriorityScheduler, RoundRobinScheduler, SJFScheduler, SRTFScheduler
+from simulator import TaskSimulator
+
+# 批量模拟支持的调度策略及对应的标量调度器
+SCHEDULERS = {
+    'fcfs': FCFSScheduler,
+    'priority': PriorityScheduler,
+    'sjf': SJFScheduler,
+    'srtf': SRTFScheduler,
+    'rr': RoundRobinScheduler,
+}
+
+# 进程状态编码
+_READY = 0
+_RUNNING = 1
+_BLOCKED = 2
+_TERMINATED = 3
+
+_NEVER = np.iinfo(np.int64).max
+
+
+class BatchSimulator:
+    """
+    向量化的批量模拟器
+
+    用形状为 (K, N) 的 NumPy 数组同时推进 K 个相互独立的模拟 (每个工作负载一行),
+    每个时间单位对所有模拟做一次数组运算。调度规则与 TaskSimulator 配合对应的标量
+    调度器逐时间单位运行的结果完全一致, 适合对比调度算法的蒙特卡洛实验。
+    """
+
+    def __init__(self, workloads, policy='fcfs', time_quantum=2):
+        """
+        Args:
+            workloads: K 个工作负载, 每个是 PCB 列表
+            policy: 调度策略, SCHEDULERS 中的键
+            time_quantum: 时间片长度 (仅 rr 使用)
+        """
+        if policy not in SCHEDULERS:
+            raise ValueError(f"不支持的调度策略: {policy}")
+        self.policy = policy
+        self.time_quantum = time_quantum
+
+        num_runs = len(workloads)
+        width = max((len(w) for w in workloads), default=0)
+        depth = max((len(p.io_times) for w in workloads for p in w), default=0)
+
+        # 不足 width 的工作负载用无效进程补齐
+        self.valid = np.zeros((num_runs, width), dtype=bool)
+        self.arrival = np.zeros((num_runs, width), dtype=np.int64)
+        self.burst = np.zeros((num_runs, width), dtype=np.int64)
+        self.priority = np.zeros((num_runs, width), dtype=np.int64)
+        # I/O点按 (K, N, M) 存储, 空位为 -1
+        self.io_points = np.full((num_runs, width, depth), -1, dtype=np.int64)
+        self.io_durations = np.zeros((num_runs, width, depth), dtype=np.int64)
+
+        for k, workload in enumerate(workloads):
+            for i, process in enumerate(workload):
+                self.valid[k, i] = True
+                self.arrival[k, i] = process.arrival_time
+                self.burst[k, i] = process.burst_time
+                self.priority[k, i] = process.static_priority
+                for j, (point, duration) in enumerate(process.io_times.items()):
+                    self.io_points[k, i, j] = point
+                    self.io_durations[k, i, j] = duration
+
+    @classmethod
+    def from_seeds(cls, seeds, num_processes, policy='fcfs', time_quantum=2, **generator_kwargs):
+        """
+        为每个随机种子生成一个工作负载
+
+        与 random.seed(seed) 后调用 TaskSimulator.create_random_processes 得到的进程相同。
+        """
+        workloads = []
+        for seed in seeds:
+            random.seed(seed)
+            simulator = TaskSimulator(None)
+            simulator.create_random_processes(num_processes, **generator_kwargs)
+            workloads.append(simulator.processes)
+        return cls(workloads, policy, time_quantum)
+
+    def run(self, max_time=100):
+        """
+        运行所有模拟
+
+        Returns:
+            字典, 每项是长度为 K 的数组: avg_waiting, avg_turnaround, avg_response,
+            completed (完成进程数), end_time (模拟结束时间)
+        """
+        num_runs, width = self.valid.shape
+        rows = np.arange(num_runs)
+        columns = np.arange(width)
+
+        state = np.full((num_runs, width), _READY, dtype=np.int8)
+        queued = np.zeros((num_runs, width), dtype=bool)  # 是否在就绪队列中
+        order = np.zeros((num_runs, width), dtype=np.int64)  # 就绪队列中的先后顺序
+        remaining = self.burst.copy()
+        executed = np.zeros((num_runs, width), dtype=np.int64)
+        waiting = np.zeros((num_runs, width), dtype=np.int64)
+        completion = np.zeros((num_runs, width), dtype=np.int64)
+        first_run = np.full((num_runs, width), -1, dtype=np.int64)
+        io_done = np.full((num_runs, width), _NEVER, dtype=np.int64)  # I/O完成的时间
+        blocked_at = np.zeros((num_runs, width), dtype=np.int64)
+
+        live = self.valid.sum(axis=1)
+        active = np.ones(num_runs, dtype=bool)
+        end_time = np.full(num_runs, max_time, dtype=np.int64)
+        current = np.full(num_runs, -1, dtype=np.int64)  # rr 的当前进程
+        time_used = np.zeros(num_runs, dtype=np.int64)
+
+        # 同一时间单位内入队的先后: 到达 (按进程顺序) < I/O完成 (按阻塞时间) < 时间片轮转
+        stride = width + max_time + 2
+
+        for time in range(max_time):
+            if not active.any():
+                break
+            base = time * stride
+            running_runs = active[:, None]
+
+            # 添加新到达的进程
+            arriving = self.valid & (self.arrival == time) & running_runs
+            if arriving.any():
+                queued |= arriving
+                order = np.where(arriving, base + columns, order)
+
+            # 处理I/O完成的进程
+            waking = (state == _BLOCKED) & (io_done == time) & running_runs
+            if waking.any():
+                state[waking] = _READY
+                queued |= waking
+                order = np.where(waking, base + width + blocked_at, order)
+
+            # 更新等待时间
+            waiting += queued & (state == _READY) & running_runs
+
+            # 选择执行的进程
+            pick = self._select(queued, order, remaining, current, time_used, active, rows,
+                                base + stride - 1)
+
+            selected = (pick >= 0) & active
+            r = rows[selected]
+            p = pick[selected]
+            if len(r):
+                state[r, p] = _RUNNING
+                first_run[r, p] = np.where(first_run[r, p] < 0, time, first_run[r, p])
+                remaining[r, p] -= 1
+                executed[r, p] += 1
+
+                # 检查进程是否完成
+                finished = remaining[r, p] <= 0
+                fr, fp = r[finished], p[finished]
+                state[fr, fp] = _TERMINATED
+                queued[fr, fp] = False
+                completion[fr, fp] = time + 1
+                np.subtract.at(live, fr, 1)
+
+                # 检查是否需要I/O (已完成的进程不再I/O)
+                match = self.io_points[r, p] == executed[r, p][:, None]
+                needs_io = match.any(axis=1) & ~finished
+                ir, ip = r[needs_io], p[needs_io]
+                if len(ir):
+                    duration = np.where(match[needs_io], self.io_durations[ir, ip], 0).sum(axis=1)
+                    state[ir, ip] = _BLOCKED
+                    queued[ir, ip] = False
+                    blocked_at[ir, ip] = time
+                    # 持续时间不为正的I/O永远不会完成
+                    io_done[ir, ip] = np.where(duration > 0, time + duration, _NEVER)
+
+            # 检查是否所有进程都已完成
+            done = active & (live == 0)
+            end_time[done] = time
+            active &= ~done
+
+        terminated = self.valid & (state == _TERMINATED)
+        completed = terminated.sum(axis=1)
+        divisor = np.maximum(completed, 1)
+        return {
+            'avg_waiting': np.where(terminated, waiting, 0).sum(axis=1) / divisor,
+            'avg_turnaround': np.where(terminated, completion - self.arrival, 0).sum(axis=1) / divisor,
+            'avg_response': np.where(terminated, first_run - self.arrival, 0).sum(axis=1) / divisor,
+            'completed': completed,
+            'end_time': end_time,
+        }
+
+    def _select(self, queued, order, remaining, current, time_used, active, rows, rotate_order):
+        """为每个模拟选出本时间单位执行的进程, 没有就绪进程时为 -1"""
+        has_ready = queued.any(axis=1) & active
+
+        if self.policy == 'rr':
+            has_current = current >= 0
+            current_queued = has_current & queued[rows, np.maximum(current, 0)]
+            switch = ~has_current | ~current_queued | (time_used >= self.time_quantum)
+
+            # 时间片用完且仍在就绪队列中的进程移到队尾
+            rotate = switch & current_queued & has_ready
+            order[rows[rotate], current[rotate]] = rotate_order
+
+            head = np.where(queued, order, _NEVER).argmin(axis=1)
+            chosen = np.where(has_ready, np.where(switch, head, current), -1)
+            used = np.where(has_ready, np.where(switch, 0, time_used) + 1, 0)
+            time_used[active] = used[active]
+            current[active] = chosen[active]
+            return chosen
+
+        if self.policy == 'fcfs':
+            key = order
+        else:
+            key = {'priority': self.priority, 'sjf': self.burst, 'srtf': remaining}[self.policy]
+            # 先按键值取最小, 键值相同时按入队顺序
+            smallest = np.where(queued, key, _NEVER).min(axis=1)
+            key = np.where(key == smallest[:, None], order, _NEVER)
+        chosen = np.where(queued, key, _NEVER).argmin(axis=1)
+        return np.where(has_ready, chosen, -1)
+
+
+def scalar_statistics(workload, policy='fcfs', time_quantum=2, max_time=100):
+    """用 TaskSimulator 逐个运行同一工作负载, 用于核对批量结果"""
+    scheduler_class = SCHEDULERS[policy]
+    scheduler = scheduler_class(time_quantum=time_quantum) if policy == 'rr' else scheduler_class()
+    simulator = TaskSimulator(scheduler)
+    simulator.processes = workload
+    simulator.run_simulation(max_time)
+    return simulator.statistics()
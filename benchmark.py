@@ -0,0 +1,198 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from scheduler import PriorityScheduler, DynamicPriorityScheduler, RoundRobinScheduler, SJFScheduler, \
+    SRTFScheduler, MLFQScheduler, CFSScheduler
+from simulator import TaskSimulator
+
+# 基准测试覆盖的调度器
+SCHEDULERS = {
+    'priority': PriorityScheduler,
+    'dynamic': DynamicPriorityScheduler,
+    'rr': RoundRobinScheduler,
+    'sjf': SJFScheduler,
+    'srtf': SRTFScheduler,
+    'mlfq': MLFQScheduler,
+    'cfs': CFSScheduler,
+}
+
+# I/O密度 -> 每个进程最多的I/O次数 (create_random_processes 的 max_io_ops)
+IO_DENSITIES = {
+    'none': 0,
+    'low': 1,
+    'high': 5,
+}
+
+SIZES = (10, 100, 1000, 10 ** 4, 10 ** 5, 10 ** 6)
+QUICK_SIZES = (10, 100, 1000)
+
+# 每个用例模拟的 进程数 x 时间单位 的上限, 大规模用例相应缩短模拟时间
+WORK_BUDGET = 10 ** 7
+
+# 每个用例至少重复运行的总时间 (秒), 避免小规模用例的计时被噪声淹没
+MIN_TIME = 0.2
+
+
+def case_key(name, size, density):
+    """用例在结果文件中的键"""
+    return f"{name}/{size}/{density}"
+
+
+def case_max_time(size, max_time=None):
+    """用例的最大模拟时间, 未指定时按进程数从 WORK_BUDGET 推算"""
+    if max_time is not None:
+        return max_time
+    return max(10, min(10000, WORK_BUDGET // size))
+
+
+def make_workload(size, density, seed=0):
+    """生成基准测试用的随机工作负载"""
+    random.seed(seed)
+    generator = TaskSimulator(None)
+    generator.create_random_processes(size, max_io_ops=IO_DENSITIES[density])
+    return generator.processes
+
+
+def run_case(name, processes, max_time, repeat=3, event_driven=False, min_time=MIN_TIME):
+    """
+    运行一个用例, 至少运行 repeat 次且总时间不少于 min_time 秒, 取最快的一次
+
+    Returns:
+        字典 {max_time, ticks, decisions, seconds, ticks_per_sec, decisions_per_sec}
+        ticks 为模拟推进的时间单位数, decisions 为调度器 get_next_process 的调用次数
+    """
+    best = None
+    runs = 0
+    elapsed = 0.0
+    while runs < repeat or elapsed < min_time:
+        scheduler = SCHEDULERS[name]()
+        calls = [0]
+        get_next_process = scheduler.get_next_process
+
+        def counted():
+            calls[0] += 1
+            return get_next_process()
+
+        scheduler.get_next_process = counted
+        simulator = TaskSimulator(scheduler)
+        simulator.processes = processes
+
+        start = time.perf_counter()
+        simulator.run_simulation(max_time, event_driven=event_driven)
+        seconds = time.perf_counter() - start
+        runs += 1
+        elapsed += seconds
+
+        if best is None or seconds < best['seconds']:
+            ticks = min(simulator.current_time + 1, max_time)
+            best = {'max_time': max_time, 'ticks': ticks, 'decisions': calls[0], 'seconds': seconds,
+                    'ticks_per_sec': ticks / seconds, 'decisions_per_sec': calls[0] / seconds}
+    return best
+
+
+def run_suite(schedulers=tuple(SCHEDULERS), sizes=SIZES, densities=tuple(IO_DENSITIES),
+              max_time=None, repeat=3, event_driven=False, seed=0, progress=print):
+    """
+    运行整个基准测试
+
+    同一进程数和I/O密度的工作负载只生成一次, 在各调度器之间复用。
+    规模不小于 10^5 的用例只运行一次 (不受 MIN_TIME 限制)。
+
+    Returns:
+        可直接保存为JSON的字典 {meta, results}
+    """
+    results = {}
+    for size in sizes:
+        for density in densities:
+            processes = make_workload(size, density, seed)
+            limit = case_max_time(size, max_time)
+            for name in schedulers:
+                if size < 10 ** 5:
+                    result = run_case(name, processes, limit, repeat, event_driven)
+                else:
+                    result = run_case(name, processes, limit, 1, event_driven, min_time=0)
+                key = case_key(name, size, density)
+                results[key] = result
+                if progress:
+                    progress(f"{key:<24} {result['ticks_per_sec']:>14,.0f} ticks/s "
+                             f"{result['decisions_per_sec']:>14,.0f} decisions/s")
+            del processes
+    meta = {'python': platform.python_version(), 'platform': platform.platform(),
+            'event_driven': event_driven, 'seed': seed, 'repeat': repeat}
+    return {'meta': meta, 'results': results}
+
+
+def save_baseline(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(report, baseline, tolerance=0.1):
+    """
+    与基线比较吞吐量
+
+    只比较两边都有、且最大模拟时间相同的用例。
+
+    Returns:
+        列表 [(用例, 指标, 基线值, 当前值, 比值)], 只包含比值低于 1 - tolerance 的回归
+    """
+    regressions = []
+    for key, result in report['results'].items():
+        old = baseline['results'].get(key)
+        if old is None or old['max_time'] != result['max_time']:
+            continue
+        for metric in ('ticks_per_sec', 'decisions_per_sec'):
+            if old[metric] <= 0:
+                continue
+            ratio = result[metric] / old[metric]
+            if ratio < 1 - tolerance:
+                regressions.append((key, metric, old[metric], result[metric], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="调度器基准测试")
+    parser.add_argument('--scheduler', action='append', choices=sorted(SCHEDULERS),
+                        help="只运行指定的调度器 (可重复)")
+    parser.add_argument('--size', action='append', type=int, help="只运行指定的进程数 (可重复)")
+    parser.add_argument('--density', action='append', choices=sorted(IO_DENSITIES),
+                        help="只运行指定的I/O密度 (可重复)")
+    parser.add_argument('--quick', action='store_true', help=f"只运行进程数 {QUICK_SIZES}")
+    parser.add_argument('--max-time', type=int, help="最大模拟时间, 默认按进程数推算")
+    parser.add_argument('--repeat', type=int, default=3, help="每个用例重复次数, 取最快的一次")
+    parser.add_argument('--event-driven', action='store_true', help="使用事件驱动模式")
+    parser.add_argument('--save', metavar='PATH', help="把结果保存为基线")
+    parser.add_argument('--compare', metavar='PATH', help="与已保存的基线比较")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="允许的吞吐量下降比例")
+    args = parser.parse_args(argv)
+
+    sizes = args.size or (QUICK_SIZES if args.quick else SIZES)
+    report = run_suite(tuple(args.scheduler or SCHEDULERS), sizes, tuple(args.density or IO_DENSITIES),
+                       args.max_time, args.repeat, args.event_driven)
+
+    if args.save:
+        save_baseline(report, args.save)
+        print(f"结果已保存到 {args.save}")
+
+    if args.compare:
+        regressions = compare(report, load_baseline(args.compare), args.tolerance)
+        if regressions:
+            print(f"发现 {len(regressions)} 项性能回归:")
+            for key, metric, old, new, ratio in regressions:
+                print(f"  {key} {metric}: {old:,.0f} -> {new:,.0f} ({ratio:.0%})")
+            return 1
+        print("没有发现性能回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+命令行模拟 (不需要图形界面)
+
+用法示例:
+    python -m cli --scheduler rr --time-quantum 4 --processes 1000 --seed 1
+    python -m cli --scheduler mlfq --trace workload.csv --max-time 100000 --json
+    python -m cli --scheduler sjf --processes 20 --gantt sjf.png
+    python -m cli --scheduler rr --cpus 8 --processes 200 --max-time 1000
+    python -m cli --scheduler srtf --processes 100000 --seed 7 --arrival exponential --burst pareto --max-time 10000000
+
+只导入 pcb、scheduler 和 simulator (多核时加上 multicore); 读取轨迹文件和绘图所需的模块在用到时才导入。
+"""
+import argparse
+import json
+import random
+import sys
+
+from scheduler import FCFSScheduler, PriorityScheduler, DynamicPriorityScheduler, RoundRobinScheduler, SJFScheduler, \
+    SRTFScheduler, MLFQScheduler, CFSScheduler
+from simulator import TaskSimulator
+
+# 向量化生成器支持的分布 (与 workload_generator 中的定义相同, 避免在解析参数时导入 numpy)
+ARRIVALS = ('uniform', 'exponential')
+BURSTS = ('uniform', 'exponential', 'pareto')
+IO_PATTERNS = ('uniform', 'bursty')
+
+SCHEDULERS = {
+    'fcfs': FCFSScheduler,
+    'priority': PriorityScheduler,
+    'dynamic': DynamicPriorityScheduler,
+    'rr': RoundRobinScheduler,
+    'sjf': SJFScheduler,
+    'srtf': SRTFScheduler,
+    'mlfq': MLFQScheduler,
+    'cfs': CFSScheduler,
+}
+
+
+def build_scheduler(args):
+    """按命令行参数创建调度器"""
+    if args.scheduler == 'dynamic':
+        return DynamicPriorityScheduler(aging_factor=args.aging_factor, lazy_aging=args.lazy_aging)
+    if args.scheduler == 'rr':
+        return RoundRobinScheduler(time_quantum=args.time_quantum)
+    if args.scheduler == 'mlfq':
+        return MLFQScheduler(time_quantum=args.time_quantum, num_queues=args.num_queues,
+                             boost_interval=args.boost_interval)
+    if args.scheduler == 'cfs':
+        return CFSScheduler(target_latency=args.target_latency, min_granularity=args.min_granularity)
+    return SCHEDULERS[args.scheduler]()
+
+
+def save_gantt(simulator, path, title):
+    """保存甘特图 (此时才导入 matplotlib, 使用不需要显示器的 Agg 后端)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    from visualization import SchedulerVisualizer
+
+    figure = SchedulerVisualizer(simulator).visualize_gantt_chart(title)
+    figure.savefig(path)
+
+
+def generate_workload(args):
+    """用 numpy 向量化生成器生成进程表 (此时才导入 numpy)"""
+    from workload_generator import WorkloadGenerator
+
+    generator = WorkloadGenerator(args.seed, arrival=args.arrival or 'uniform', burst=args.burst or 'uniform',
+                                  io=args.io or 'uniform', max_burst=args.max_burst)
+    return generator.table(args.processes)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m cli', description="任务调度模拟 (命令行)")
+    parser.add_argument('--scheduler', choices=sorted(SCHEDULERS), default='priority', help="调度算法")
+    parser.add_argument('--time-quantum', type=int, default=2, help="时间片长度 (rr, mlfq)")
+    parser.add_argument('--aging-factor', type=int, default=3, help="老化因子 (dynamic)")
+    parser.add_argument('--lazy-aging', action='store_true', help="使用惰性老化 (dynamic)")
+    parser.add_argument('--num-queues', type=int, default=3, help="队列级数 (mlfq)")
+    parser.add_argument('--boost-interval', type=int, help="优先级提升间隔 (mlfq)")
+    parser.add_argument('--target-latency', type=int, default=16, help="调度周期 (cfs)")
+    parser.add_argument('--min-granularity', type=int, default=2, help="最短时间片 (cfs)")
+
+    workload = parser.add_argument_group("工作负载")
+    workload.add_argument('--processes', type=int, default=10, help="随机生成的进程数")
+    workload.add_argument('--seed', type=int, help="随机种子")
+    workload.add_argument('--trace', metavar='PATH', help="从CSV/JSONL轨迹文件流式读取进程")
+    workload.add_argument('--arrival', choices=ARRIVALS,
+                          help="到达时间分布, 指定 --arrival/--burst/--io 之一时使用 numpy 向量化生成器")
+    workload.add_argument('--burst', choices=BURSTS, help="执行时间分布")
+    workload.add_argument('--io', choices=IO_PATTERNS, help="I/O模式")
+    workload.add_argument('--max-burst', type=int, default=20, help="最长执行时间 (向量化生成器)")
+
+    run = parser.add_argument_group("运行")
+    run.add_argument('--max-time', type=int, default=100, help="最大模拟时间")
+    run.add_argument('--cpus', type=int, default=1, help="CPU数, 大于1时每个CPU一个运行队列 (逐时间单位模拟)")
+    run.add_argument('--balance-interval', type=int, default=10, help="多核负载均衡周期, 0表示不均衡")
+    run.add_argument('--no-stealing', action='store_true', help="多核时关闭空闲CPU的工作窃取")
+    run.add_argument('--tick', action='store_true', help="逐时间单位模拟 (默认使用结果相同的事件驱动模式)")
+    run.add_argument('--verbose', action='store_true', help="逐条打印模拟事件")
+
+    output = parser.add_argument_group("输出")
+    output.add_argument('--json', action='store_true', help="以JSON格式打印统计结果")
+    output.add_argument('--output', metavar='PATH', help="把统计结果保存为JSON文件")
+    output.add_argument('--gantt', metavar='PATH', help="保存甘特图图片 (需要 matplotlib)")
+    output.add_argument('--profile', metavar='PATH',
+                        help="记录各调度阶段的耗时并保存 (.prof 为 pstats 格式, 其他为JSON)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    trace = None
+    if args.verbose:
+        from tracing import PrintTraceSink
+        trace = PrintTraceSink()
+    profiler = None
+    if args.profile:
+        from profiling import SimulationProfiler
+        profiler = SimulationProfiler()
+
+    if args.cpus > 1:
+        if args.trace:
+            print("多核模拟不支持 --trace 流式输入", file=sys.stderr)
+            return 2
+        from multicore import MultiCoreSimulator
+        simulator = MultiCoreSimulator(lambda: build_scheduler(args), num_cpus=args.cpus,
+                                       balance_interval=args.balance_interval,
+                                       work_stealing=not args.no_stealing, trace=trace, profiler=profiler)
+    else:
+        simulator = TaskSimulator(build_scheduler(args), trace=trace, profiler=profiler)
+
+    if args.trace:
+        from workload import read_trace
+        simulator.stream_processes(read_trace(args.trace))
+    elif args.arrival or args.burst or args.io:
+        simulator.use_process_table(generate_workload(args))
+    else:
+        if args.seed is not None:
+            random.seed(args.seed)
+        simulator.create_random_processes(args.processes)
+
+    simulator.run_simulation(args.max_time, event_driven=not args.tick and args.cpus == 1)
+
+    result = simulator.statistics()
+    result['scheduler'] = args.scheduler
+    result['end_time'] = simulator.current_time
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        print(f"调度算法: {args.scheduler}")
+        print(f"平均等待时间: {result['avg_waiting']:.2f} 时间单位")
+        print(f"平均周转时间: {result['avg_turnaround']:.2f} 时间单位")
+        print(f"平均响应时间: {result['avg_response']:.2f} 时间单位")
+        print(f"完成进程数: {result['completed']}/{result['total']}")
+        print(f"结束时间: {result['end_time']}")
+        if 'cpu_utilization' in result:
+            usage = ", ".join(f"{u:.0%}" for u in result['cpu_utilization'])
+            print(f"各CPU利用率: {usage} (迁移 {result['migrations']}, 窃取 {result['steals']})")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    if args.gantt:
+        save_gantt(simulator, args.gantt, f"{args.scheduler} scheduling")
+
+    if args.profile:
+        if args.profile.endswith('.prof'):
+            profiler.dump_stats(args.profile)
+        else:
+            profiler.save_json(args.profile)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
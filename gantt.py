@@ -0,0 +1,142 @@
+import numpy as np
+from matplotlib.collections import PolyCollection
+
+
+def merge_segments(starts, ends, min_width):
+    """
+    细节层次合并: 间隔小于 min_width 的相邻段合并为一段, 合并后不足 min_width 的段加宽到 min_width
+
+    starts 和 ends 为按时间排序、互不重叠的段的起止时间 (numpy 数组), 复杂度 O(n)。
+    """
+    if len(starts) == 0 or min_width <= 0:
+        return starts, ends
+    gaps = starts[1:] - ends[:-1]
+    breaks = np.flatnonzero(gaps >= min_width) + 1
+    first = np.concatenate(([0], breaks))
+    last = np.concatenate((breaks - 1, [len(starts) - 1]))
+    merged_starts = starts[first]
+    merged_ends = np.maximum(ends[last], merged_starts + min_width)
+    return merged_starts, merged_ends
+
+
+def io_periods(process):
+    """已执行过的I/O时段 [(start, end), ...], 推算方式与原甘特图相同"""
+    periods = []
+    for io_time, io_duration in sorted(process.io_times.items()):
+        if io_time < process.executed_time:
+            for start, end in process.execution_history:
+                if start <= io_time < end:
+                    periods.append((io_time + 1, io_time + 1 + io_duration))  # I/O在执行点之后开始
+                    break
+    return periods
+
+
+def segment_verts(starts, ends, y, height):
+    """把段转换为 PolyCollection 使用的矩形顶点, 形状为 (n, 4, 2)"""
+    bottom = y - height / 2
+    top = y + height / 2
+    verts = np.empty((len(starts), 4, 2))
+    verts[:, 0, 0] = verts[:, 1, 0] = starts
+    verts[:, 2, 0] = verts[:, 3, 0] = ends
+    verts[:, 0, 1] = verts[:, 3, 1] = bottom
+    verts[:, 1, 1] = verts[:, 2, 1] = top
+    return verts
+
+
+class GanttRow:
+    """甘特图中的一行: 完整精度的段和绘制它们的一个 PolyCollection"""
+
+    def __init__(self, y, height, collection):
+        self.y = y
+        self.height = height
+        self.collection = collection
+        self.starts = np.zeros(0)
+        self.ends = np.zeros(0)
+
+
+class GanttChart:
+    """
+    用集合绘制的甘特图
+
+    每行 (每个进程的执行段或I/O段) 只有一个 PolyCollection, 绘制开销与段数无关。
+    坐标轴的显示范围或窗口大小变化时, 只取可见范围内的段, 并把小于一个像素的间隔合并,
+    缩小时每行最多约为像素数个矩形, 放大后恢复完整细节。
+    """
+
+    def __init__(self, ax):
+        self.ax = ax
+        self.rows = []
+        self._updating = False
+        # ax.clear() 会重建坐标轴的回调表, 窗口大小的回调需要在 disconnect 中手动移除
+        ax.callbacks.connect('xlim_changed', self._on_view_changed)
+        self._resize_cid = ax.figure.canvas.mpl_connect('resize_event', self._on_view_changed)
+
+    def add_row(self, y, segments=(), height=0.5, **style):
+        """
+        添加一行
+
+        Args:
+            y: 行的纵坐标
+            segments: [(start, end), ...], 按时间排序
+            height: 矩形高度
+            style: 传给 PolyCollection 的样式 (facecolors, edgecolors, alpha, hatch 等)
+
+        Returns:
+            行号, 用于 add_segments
+        """
+        collection = PolyCollection([], **style)
+        self.ax.add_collection(collection)
+        row = GanttRow(y, height, collection)
+        self.rows.append(row)
+        self.add_segments(len(self.rows) - 1, segments)
+        return len(self.rows) - 1
+
+    def add_segments(self, index, segments):
+        """向一行追加段 (与最后一段首尾相接时合并), 用于运行中的增量绘制"""
+        if not len(segments):
+            return
+        row = self.rows[index]
+        segments = np.asarray(segments, dtype=float).reshape(-1, 2)
+        starts, ends = segments[:, 0], segments[:, 1]
+        if len(row.ends) and row.ends[-1] == starts[0]:
+            row.ends[-1] = ends[0]
+            starts, ends = starts[1:], ends[1:]
+        row.starts = np.concatenate((row.starts, starts))
+        # 保存累计最大值, 相互重叠的段 (如I/O时段) 也能二分查找和合并
+        row.ends = np.maximum.accumulate(np.concatenate((row.ends, ends)))
+        self._update_row(row, *self._view())
+
+    def refresh(self):
+        """按当前的显示范围重新计算所有行"""
+        view = self._view()
+        for row in self.rows:
+            self._update_row(row, *view)
+
+    def segment_count(self):
+        """当前绘制的矩形总数"""
+        return sum(len(row.collection.get_paths()) for row in self.rows)
+
+    def disconnect(self):
+        """不再响应窗口大小变化 (坐标轴被清空或替换时调用)"""
+        self.ax.figure.canvas.mpl_disconnect(self._resize_cid)
+
+    def _view(self):
+        """(可见范围左端, 右端, 每像素对应的时间单位数)"""
+        x0, x1 = self.ax.get_xlim()
+        pixels = max(self.ax.bbox.width, 1)
+        return x0, x1, (x1 - x0) / pixels
+
+    def _update_row(self, row, x0, x1, per_pixel):
+        lo = np.searchsorted(row.ends, x0, side='right')
+        hi = np.searchsorted(row.starts, x1, side='left')
+        starts, ends = merge_segments(row.starts[lo:hi], row.ends[lo:hi], per_pixel)
+        row.collection.set_verts(segment_verts(starts, ends, row.y, row.height))
+
+    def _on_view_changed(self, *args):
+        if self._updating:
+            return
+        self._updating = True
+        try:
+            self.refresh()
+        finally:
+            self._updating = False
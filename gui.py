@@ -1,14 +1,55 @@
+import queue
+import threading
+import time
+import traceback
 import tkinter as tk
 import tkinter as tk
 from tkinter import ttk
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
-import numpy as np
-from pcb import PCB
-from scheduler import PriorityScheduler, DynamicPriorityScheduler, RoundRobinScheduler, SJFScheduler, SRTFScheduler, \
-    MLFQScheduler
+from scheduler import FCFSScheduler, PriorityScheduler, DynamicPriorityScheduler, RoundRobinScheduler, SJFScheduler, \
+    SRTFScheduler, MLFQScheduler, CFSScheduler
 from simulator import TaskSimulator
+from gantt import GanttChart, io_periods
+from online_stats import OnlineStatistics
+from result_cache import ResultCache
+import tracing
+
+# 模拟运行期间轮询结果队列的间隔 (毫秒) 和甘特图的最高刷新率
+POLL_INTERVAL = 30
+MAX_FPS = 10
+
+
+class SimulationFeed(tracing.TraceSink):
+    """
+    在工作线程中收集模拟事件, 分批放入队列交给界面线程
+
+    每攒够 batch_size 条事件或距上次发送超过 interval 秒时发送一批,
+    同时附带在线统计的快照 (在工作线程中计算, 界面线程不直接读取模拟器的状态)。
+    """
+
+    def __init__(self, stats, batch_size=2000, interval=0.05):
+        self.queue = queue.Queue()
+        self.stats = stats
+        self.batch_size = batch_size
+        self.interval = interval
+        self._records = []
+        self._last_sent = time.perf_counter()
+
+    def emit(self, time_unit, event, pid=None, data=None):
+        self._records.append((time_unit, event, pid, data))
+        if len(self._records) >= self.batch_size or time.perf_counter() - self._last_sent >= self.interval:
+            self.flush()
+
+    def flush(self):
+        self.queue.put(('events', self._records, self.stats.snapshot()))
+        self._records = []
+        self._last_sent = time.perf_counter()
+
+    def close(self):
+        if self._records:
+            self.flush()
 
 
 class SimulatorGUI:
@@ -24,18 +65,22 @@ class SimulatorGUI:
 
         # 初始化变量
         self.schedulers = {
+            "先来先服务(FCFS)": FCFSScheduler(),
             "优先级调度": PriorityScheduler(),
             "动态优先级调度": DynamicPriorityScheduler(),
             "时间片轮转": RoundRobinScheduler(time_quantum=2),
             "短作业优先(SJF)": SJFScheduler(),
             "短剩余时间优先(SRTF)": SRTFScheduler(),
-            "多级反馈队列": MLFQScheduler(time_quantum=2, num_queues=3)
+            "多级反馈队列": MLFQScheduler(time_quantum=2, num_queues=3),
+            "完全公平调度(CFS)": CFSScheduler()
         }
         self.selected_scheduler = tk.StringVar(value="优先级调度")
         self.max_time = tk.IntVar(value=50)
         self.time_quantum = tk.IntVar(value=2)
         self.num_processes = tk.IntVar(value=5)
         self.simulator = TaskSimulator(self.schedulers[self.selected_scheduler.get()])
+        # 进程和调度器参数都没有变化时直接显示上一次的结果
+        self.result_cache = ResultCache(max_entries=32)
 
         # 创建主框架
         main_frame = ttk.Frame(root, padding="10")
@@ -47,34 +92,52 @@ class SimulatorGUI:
 
         # 调度算法选择
         ttk.Label(control_panel, text="调度算法:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
-        scheduler_combo = ttk.Combobox(control_panel, textvariable=self.selected_scheduler,
-                                       values=list(self.schedulers.keys()),
-                                       state="readonly")
-        scheduler_combo.grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
-        scheduler_combo.bind("<<ComboboxSelected>>", self.on_scheduler_changed)
+        self.scheduler_combo = ttk.Combobox(control_panel, textvariable=self.selected_scheduler,
+                                            values=list(self.schedulers.keys()),
+                                            state="readonly")
+        self.scheduler_combo.grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
+        self.scheduler_combo.bind("<<ComboboxSelected>>", self.on_scheduler_changed)
 
         # 时间片长度
         ttk.Label(control_panel, text="时间片长度:").grid(row=0, column=2, sticky=tk.W, padx=5, pady=5)
-        quantum_entry = ttk.Entry(control_panel, textvariable=self.time_quantum, width=5)
-        quantum_entry.grid(row=0, column=3, sticky=tk.W, padx=5, pady=5)
+        self.quantum_entry = ttk.Entry(control_panel, textvariable=self.time_quantum, width=5)
+        self.quantum_entry.grid(row=0, column=3, sticky=tk.W, padx=5, pady=5)
 
         # 最大运行时间
         ttk.Label(control_panel, text="最大运行时间:").grid(row=0, column=4, sticky=tk.W, padx=5, pady=5)
-        max_time_entry = ttk.Entry(control_panel, textvariable=self.max_time, width=5)
-        max_time_entry.grid(row=0, column=5, sticky=tk.W, padx=5, pady=5)
+        self.max_time_entry = ttk.Entry(control_panel, textvariable=self.max_time, width=5)
+        self.max_time_entry.grid(row=0, column=5, sticky=tk.W, padx=5, pady=5)
 
         # 进程数量
         ttk.Label(control_panel, text="进程数量:").grid(row=0, column=6, sticky=tk.W, padx=5, pady=5)
-        num_proc_entry = ttk.Entry(control_panel, textvariable=self.num_processes, width=5)
-        num_proc_entry.grid(row=0, column=7, sticky=tk.W, padx=5, pady=5)
+        self.num_proc_entry = ttk.Entry(control_panel, textvariable=self.num_processes, width=5)
+        self.num_proc_entry.grid(row=0, column=7, sticky=tk.W, padx=5, pady=5)
 
         # 按钮
         button_frame = ttk.Frame(control_panel)
         button_frame.grid(row=1, column=0, columnspan=8, pady=5)
 
-        ttk.Button(button_frame, text="生成进程", command=self.generate_processes).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="运行模拟", command=self.run_simulation).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="清除", command=self.clear).pack(side=tk.LEFT, padx=5)
+        self.generate_button = ttk.Button(button_frame, text="生成进程", command=self.generate_processes)
+        self.generate_button.pack(side=tk.LEFT, padx=5)
+        self.run_button = ttk.Button(button_frame, text="运行模拟", command=self.run_simulation)
+        self.run_button.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ttk.Button(button_frame, text="取消", command=self.cancel_simulation, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+        self.clear_button = ttk.Button(button_frame, text="清除", command=self.clear)
+        self.clear_button.pack(side=tk.LEFT, padx=5)
+
+        # 模拟进度
+        self.progress = ttk.Progressbar(button_frame, length=200, mode='determinate')
+        self.progress.pack(side=tk.LEFT, padx=5)
+        self.progress_label = ttk.Label(button_frame, text="")
+        self.progress_label.pack(side=tk.LEFT, padx=5)
+
+        # 后台模拟的状态 (运行期间使用开始时记录的模拟器和最大时间, 不受界面输入的影响)
+        self.worker = None
+        self.feed = None
+        self.cancelled = False
+        self.running_simulator = None
+        self.run_max_time = self.max_time.get()
 
         # 进程列表 - 减少高度以留出更多空间给统计数据
         process_frame = ttk.LabelFrame(main_frame, text="进程列表", padding="10")
@@ -102,6 +165,7 @@ class SimulatorGUI:
         # 创建matplotlib图表 - 减小图表高度
         self.figure = Figure(figsize=(12, 3.2), dpi=100)  # 减小高度
         self.plot = self.figure.add_subplot(111)
+        self.gantt = None
         self.canvas = FigureCanvasTkAgg(self.figure, master=viz_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
@@ -144,7 +208,7 @@ class SimulatorGUI:
         self.reset_statistics()
 
         # 清空图表
-        self.plot.clear()
+        self.new_gantt_chart()
         self.canvas.draw()
 
     def update_process_table(self):
@@ -174,39 +238,187 @@ class SimulatorGUI:
             self.schedulers[scheduler_name] = MLFQScheduler(time_quantum=self.time_quantum.get(), num_queues=3)
 
         # 创建新模拟器，但保留现有进程
+        processes = self.simulator.processes
         self.simulator = TaskSimulator(self.schedulers[scheduler_name])
 
         # 如果没有进程，先生成进程
-        if not hasattr(self, 'processes') or not self.simulator.processes:
+        if not processes:
             self.generate_processes()
         else:
-            # 保留现有进程
-            processes_backup = self.simulator.processes.copy()
-            self.simulator.processes = processes_backup
-
-        # 运行模拟
-        try:
-            self.simulator.run_simulation(self.max_time.get())
-            print(f"模拟完成: {scheduler_name}, 执行历史记录: {len(self.simulator.execution_history)}")
+            self.simulator.processes = processes
 
-            # 更新可视化
+        self.run_max_time = self.max_time.get()
+        if self.result_cache.load(self.simulator, self.run_max_time) is not None:
+            self.progress['value'] = 100
+            self.progress_label.config(text="使用缓存的结果")
             self.update_visualization()
-
-            # 更新统计数据
             self.update_statistics()
-
+            return
+
+        # 在工作线程中运行模拟, 界面线程通过 root.after 轮询结果
+        stats = OnlineStatistics(window=max(10, self.run_max_time // 10))
+        self.feed = SimulationFeed(stats)
+        self.running_simulator = self.simulator
+        self.simulator.trace = self.feed
+        self.simulator.stats = stats
+        self.start_live_chart()
+        self.set_running(True)
+        self.cancelled = False
+
+        self.worker = threading.Thread(target=self.simulate, args=(self.simulator, self.run_max_time, self.feed),
+                                       daemon=True)
+        self.worker.start()
+        self.root.after(POLL_INTERVAL, self.poll_simulation)
+
+    def simulate(self, simulator, max_time, feed):
+        """工作线程: 运行模拟, 结束后发送完成消息"""
+        try:
+            simulator.run_simulation(max_time, event_driven=True)
         except Exception as e:
-            import traceback
             traceback.print_exc()
-            print(f"模拟过程发生错误: {e}")
+            feed.close()
+            feed.queue.put(('error', e, None))
+        else:
+            feed.close()
+            feed.queue.put(('done', None, None))
+
+    def cancel_simulation(self):
+        """取消正在运行的模拟"""
+        if self.worker is not None:
+            self.running_simulator.stop()
+            self.cancelled = True
+            self.progress_label.config(text="正在取消...")
+
+    def set_running(self, running):
+        """切换运行中和空闲时的按钮和输入框状态 (运行期间不能更换调度器或修改参数)"""
+        idle_state = tk.DISABLED if running else tk.NORMAL
+        self.generate_button.config(state=idle_state)
+        self.run_button.config(state=idle_state)
+        self.clear_button.config(state=idle_state)
+        self.cancel_button.config(state=tk.NORMAL if running else tk.DISABLED)
+        self.scheduler_combo.config(state=tk.DISABLED if running else "readonly")
+        for entry in (self.quantum_entry, self.max_time_entry, self.num_proc_entry):
+            entry.config(state=idle_state)
+
+    def poll_simulation(self):
+        """界面线程: 取出工作线程发来的事件, 按限定的帧率增量更新甘特图"""
+        finished = None
+        snapshot = None
+        while True:
+            try:
+                kind, records, latest = self.feed.queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'events':
+                self.add_live_events(records)
+                snapshot = latest
+            else:
+                finished = (kind, records)
+
+        if snapshot is not None:
+            self.show_live_statistics(snapshot)
+        now = time.perf_counter()
+        if finished or now - self.last_draw >= 1 / MAX_FPS:
+            self.draw_live_segments()
+            self.last_draw = now
+
+        max_time = self.run_max_time
+        self.progress['value'] = min(100, 100 * (self.live_time + 1) / max(1, max_time))
+        self.progress_label.config(text=f"时间 {self.live_time + 1}/{max_time}")
+
+        if finished is None:
+            self.root.after(POLL_INTERVAL, self.poll_simulation)
+            return
+
+        kind, error = finished
+        simulator = self.simulator = self.running_simulator
+        self.worker = None
+        self.running_simulator = None
+        simulator.trace = tracing.NullTraceSink()
+        self.set_running(False)
+        if kind == 'error':
+            print(f"模拟过程发生错误: {error}")
+        else:
+            print(f"模拟完成: {self.selected_scheduler.get()}, 执行历史记录: {len(simulator.execution_history)}")
+            if not self.cancelled:
+                self.result_cache.store(simulator, self.run_max_time)
+        if self.cancelled:
+            self.progress_label.config(text=f"已取消 (时间 {simulator.current_time})")
+
+        # 即使发生错误也尝试更新统计和可视化
+        self.update_visualization()
+        self.update_statistics()
+
+    def start_live_chart(self):
+        """清空图表, 为运行中的增量绘制做准备"""
+        gantt = self.new_gantt_chart()
+        self.live_rows = {}  # pid -> 甘特图中的行号
+        self.live_pending = {}  # pid -> 尚未绘制的执行段 [[start, end], ...]
+        self.live_time = -1
+        self.last_draw = 0.0
 
-            # 即使发生错误也尝试更新统计和可视化
-            self.update_statistics()
-            self.update_visualization()
+        sorted_processes = sorted(self.simulator.processes, key=lambda p: p.pid)
+        for i, process in enumerate(sorted_processes):
+            self.live_rows[process.pid] = gantt.add_row(i + 1, height=0.5, facecolors=process.color,
+                                                        alpha=0.8, edgecolors='black')
+        self.plot.set_yticks(range(1, len(sorted_processes) + 1))
+        self.plot.set_yticklabels([f"P{process.pid}" for process in sorted_processes])
+        self.plot.set_xlabel('时间单位')
+        self.plot.set_title(f'进程执行时间轴 ({self.selected_scheduler.get()}, 运行中)')
+        self.plot.grid(axis='x', linestyle='--', alpha=0.7)
+        self.plot.set_xlim(0, self.run_max_time)
+        self.plot.set_ylim(0, len(self.live_rows) + 1)
+        self.canvas.draw_idle()
+
+    def add_live_events(self, records):
+        """把一批事件中的执行段合并进待绘制的列表"""
+        pending = self.live_pending
+        for time_unit, event, pid, data in records:
+            if event == tracing.RUN:
+                start = data[0]
+                segments = pending.setdefault(pid, [])
+                if segments and segments[-1][1] == start:
+                    segments[-1][1] = time_unit + 1
+                else:
+                    segments.append([start, time_unit + 1])
+            if event in (tracing.RUN, tracing.IDLE) and time_unit > self.live_time:
+                self.live_time = time_unit
+
+    def draw_live_segments(self):
+        """把上一帧之后新增的执行段追加到各进程的行中"""
+        if not self.live_pending:
+            return
+        for pid, segments in self.live_pending.items():
+            row = self.live_rows.get(pid)
+            if row is not None:
+                self.gantt.add_segments(row, segments)
+        self.live_pending = {}
+        self.canvas.draw_idle()
+
+    def show_live_statistics(self, snapshot):
+        """运行期间显示在线统计"""
+        self.stats_text.delete(1.0, tk.END)
+        turnaround = snapshot['turnaround']
+        p50, p95, p99 = (turnaround[key] or 0 for key in ('p50', 'p95', 'p99'))
+        stats_text = (f"平均等待时间: {snapshot['avg_waiting']:.2f} 时间单位\n"
+                      f"平均周转时间: {snapshot['avg_turnaround']:.2f} 时间单位 "
+                      f"(p50 {p50:.1f} / p95 {p95:.1f} / p99 {p99:.1f})\n"
+                      f"平均响应时间: {snapshot['avg_response']:.2f} 时间单位\n"
+                      f"CPU利用率: {snapshot['utilization']:.1%} (最近 {snapshot['window_utilization']:.1%})\n"
+                      f"完成进程数: {snapshot['completed']}/{len(self.live_rows)} (运行中)")
+        self.stats_text.insert(tk.END, stats_text)
+
+    def new_gantt_chart(self):
+        """清空图表, 返回新的甘特图"""
+        if self.gantt is not None:
+            self.gantt.disconnect()
+        self.plot.clear()
+        self.gantt = GanttChart(self.plot)
+        return self.gantt
 
     def update_visualization(self):
         """更新可视化视图"""
-        self.plot.clear()
+        gantt = self.new_gantt_chart()
 
         # 创建甘特图
         y_ticks = []
@@ -214,6 +426,8 @@ class SimulatorGUI:
 
         # 按PID排序进程以保持一致的显示
         sorted_processes = sorted(self.simulator.processes, key=lambda p: p.pid)
+        periods = {process.pid: io_periods(process) for process in sorted_processes}
+        show_io_labels = sum(len(p) for p in periods.values()) <= 100  # I/O很多时不逐个标注
 
         for i, process in enumerate(sorted_processes):
             y_pos = i + 1
@@ -225,31 +439,18 @@ class SimulatorGUI:
                 self.plot.text(5, y_pos, f"未执行 (优先级:{process.static_priority}, 到达时间:{process.arrival_time})",
                                ha='left', va='center', color='red', fontsize=8)
 
-            # 绘制执行时段
-            for start, end in process.execution_history:
-                self.plot.barh(y_pos, end - start, left=start, height=0.5,
-                               color=process.color, alpha=0.8, edgecolor='black')
+            # 绘制执行时段 (每个进程一个集合)
+            gantt.add_row(y_pos, process.execution_history, height=0.5,
+                          facecolors=process.color, alpha=0.8, edgecolors='black')
 
             # 绘制I/O时段
-            io_shown = set()  # 避免重复显示同一时间点的I/O
-            for io_time, io_duration in process.io_times.items():
-                # 只考虑已执行过的I/O
-                if io_time < process.executed_time and io_time not in io_shown:
-                    # 查找此I/O操作可能的开始时间
-                    io_start = None
-                    for start, end in process.execution_history:
-                        if start <= io_time < end:
-                            io_start = io_time + 1  # I/O在执行点之后开始
-                            break
-
-                    if io_start is not None:
-                        self.plot.barh(y_pos, io_duration, left=io_start, height=0.3,
-                                       color='gray', alpha=0.6, edgecolor='black', hatch='///')
-
-                        # 添加I/O标签
-                        self.plot.text(io_start + io_duration / 2, y_pos, 'I/O',
-                                       ha='center', va='center', color='black', fontsize=8)
-                        io_shown.add(io_time)
+            gantt.add_row(y_pos, periods[process.pid], height=0.3,
+                          facecolors='gray', alpha=0.6, edgecolors='black', hatch='///')
+            if show_io_labels:
+                for io_start, io_end in periods[process.pid]:
+                    # 添加I/O标签
+                    self.plot.text((io_start + io_end) / 2, y_pos, 'I/O',
+                                   ha='center', va='center', color='black', fontsize=8)
 
         # 设置图表属性
         self.plot.set_yticks(y_ticks)
@@ -257,15 +458,15 @@ class SimulatorGUI:
         self.plot.set_xlabel('时间单位')
         self.plot.set_title(f'进程执行时间轴 ({self.selected_scheduler.get()})')
         self.plot.grid(axis='x', linestyle='--', alpha=0.7)
+        self.plot.set_ylim(0, len(sorted_processes) + 1)
 
         # 设置x轴限制
-        max_time = max([end for p in sorted_processes for _, end in p.execution_history], default=0)
+        max_time = max((p.execution_history[-1][1] for p in sorted_processes if p.execution_history), default=0)
         if max_time == 0:
             max_time = self.simulator.current_time
 
-        self.plot.set_xlim(0, max(max_time + 1, self.max_time.get()))
-
         self.figure.tight_layout()
+        self.plot.set_xlim(0, max(max_time + 1, self.run_max_time))
         self.canvas.draw()
 
     def reset_statistics(self):
@@ -284,32 +485,11 @@ class SimulatorGUI:
         self.stats_text.delete(1.0, tk.END)
 
         # 计算统计指标
-        total_waiting_time = 0
-        total_turnaround_time = 0
-        total_response_time = 0
-        completed_count = 0
-
-        # 计算各项指标
-        for process in self.simulator.processes:
-            if process.state == PCB.TERMINATED:  # 仅考虑已完成的进程
-                completed_count += 1
-                turnaround_time = process.completion_time - process.arrival_time
-                total_turnaround_time += turnaround_time
-                total_waiting_time += process.waiting_time
-
-                # 响应时间是从到达到首次执行的时间
-                if process.execution_history:
-                    first_exec_time = process.execution_history[0][0]
-                    response_time = first_exec_time - process.arrival_time
-                    total_response_time += response_time
-
-        # 计算平均值 - 避免除零错误
-        if completed_count > 0:
-            avg_waiting = total_waiting_time / completed_count
-            avg_turnaround = total_turnaround_time / completed_count
-            avg_response = total_response_time / completed_count
-        else:
-            avg_waiting = avg_turnaround = avg_response = 0
+        stats = self.simulator.statistics()
+        avg_waiting = stats['avg_waiting']
+        avg_turnaround = stats['avg_turnaround']
+        avg_response = stats['avg_response']
+        completed_count = stats['completed']
 
         # 显示统计结果
         stats_text = (f"平均等待时间: {avg_waiting:.2f} 时间单位\n"
@@ -327,7 +507,7 @@ class SimulatorGUI:
             self.process_table.delete(item)
 
         # 清空图表
-        self.plot.clear()
+        self.new_gantt_chart()
         self.canvas.draw()
 
         # 清空统计数据
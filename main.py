@@ -1,11 +1,18 @@
-import tkinter as tk
-from gui import SimulatorGUI
+import sys
+
 
 def main():
-    """主程序入口"""
+    """主程序入口 (带参数时在命令行中运行, 见 cli.py)"""
+    if len(sys.argv) > 1:
+        from cli import main as cli_main
+        return cli_main()
+
+    import tkinter as tk
+    from gui import SimulatorGUI
+
     root = tk.Tk()
     app = SimulatorGUI(root)
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,254 @@
+from pcb import PCB
+from simulator import TaskSimulator
+from timeline import ExecutionTimeline
+import tracing
+
+
+class CPUCore:
+    """多核模拟中的一个CPU: 自己的调度器 (运行队列) 和执行历史"""
+
+    def __init__(self, index, scheduler):
+        self.index = index
+        self.scheduler = scheduler
+        self.execution_history = ExecutionTimeline()
+        self.current = None  # 上一个时间单位执行的进程
+        self.busy_ticks = 0
+        self.migrations_in = 0  # 迁入的进程数 (含窃取)
+        self.steals = 0  # 空闲时从其他CPU窃取的进程数
+
+    @property
+    def load(self):
+        """运行队列长度 (就绪进程数)"""
+        return self.scheduler.ready_count
+
+    def utilization(self):
+        """已模拟的时间单位中CPU忙碌的比例"""
+        elapsed = len(self.execution_history)
+        return self.busy_ticks / elapsed if elapsed else 0
+
+
+class MultiCoreSimulator(TaskSimulator):
+    """
+    多核 (SMP) 任务调度模拟器
+
+    每个CPU有自己的调度器实例作为运行队列, 每个时间单位各CPU独立选出并执行一个进程。
+    新到达的进程放到就绪进程最少的CPU上; 每隔 balance_interval 个时间单位做一次负载均衡,
+    把进程从最忙的CPU迁移到最闲的CPU, 直到两者的就绪进程数相差不超过1;
+    开启 work_stealing 时, 运行队列为空的CPU在选择进程前从最忙的CPU窃取一个进程。
+    上一个时间单位正在某个CPU上执行的进程不会被迁移。I/O完成的进程回到原来的CPU。
+
+    只支持逐时间单位模拟, 不支持流式输入。execution_history 为每个CPU一个
+    timeline.ExecutionTimeline 的列表。在线统计的 utilization 为平均忙碌的CPU数。
+    """
+
+    def __init__(self, scheduler, num_cpus=4, balance_interval=10, work_stealing=True, trace=None, stats=None,
+                 profiler=None):
+        """
+        Args:
+            scheduler: 调度器类或返回新调度器实例的函数, 每个CPU调用一次,
+                例如 RoundRobinScheduler 或 lambda: MLFQScheduler(time_quantum=4)
+            num_cpus: CPU数
+            balance_interval: 负载均衡的周期 (时间单位), None或0表示不做周期均衡
+            work_stealing: 空闲的CPU是否从其他CPU窃取进程
+            trace: 跟踪输出, 同 TaskSimulator
+            stats: 在线统计, 同 TaskSimulator
+            profiler: 调度阶段的计时, 同 TaskSimulator
+        """
+        if num_cpus < 1:
+            raise ValueError("CPU数必须大于0")
+        super().__init__(None, trace, stats, profiler)
+        self.scheduler_factory = scheduler
+        self.num_cpus = num_cpus
+        self.balance_interval = balance_interval
+        self.work_stealing = work_stealing
+        self._reset_scheduler()
+        self.execution_history = [core.execution_history for core in self.cores]
+
+    def start(self, event_driven=False, history=None):
+        """开始新一轮模拟, 参数含义同 TaskSimulator.run_simulation"""
+        if event_driven:
+            raise ValueError("多核模拟只支持逐时间单位模拟")
+        if history is not None:
+            raise ValueError("多核模拟的执行历史按CPU分别记录, 不能指定 history")
+        if self._stream is not None:
+            raise ValueError("多核模拟不支持流式输入")
+        super().start()
+        self.execution_history = [core.execution_history for core in self.cores]
+
+    def _advance(self, until):
+        trace = self.trace
+        tracing_enabled = self._tracing
+        stats = self.stats
+        cores = self.cores
+
+        while self.current_time < until and not self._stop_requested and not self._finished:
+            self._admit_arrivals()
+
+            for core in cores:
+                core.scheduler.unblock_processes()
+                core.scheduler.update_queues()
+
+            if self.balance_interval and self.current_time % self.balance_interval == 0:
+                self._balance()
+            if self.work_stealing:
+                for core in cores:
+                    if core.load == 0:
+                        self._steal(core)
+
+            now = self.current_time
+            busy = 0
+            for core in cores:
+                scheduler = core.scheduler
+                process = core.current = scheduler.get_next_process()
+                if process is None:
+                    core.execution_history.append(now, None, None)
+                    continue
+
+                busy += 1
+                core.busy_ticks += 1
+                scheduler.start_running(process)
+                process.state = PCB.RUNNING
+                process.execute(1)
+                core.execution_history.append(now, process.pid, process.state)
+                if tracing_enabled:
+                    trace.emit(now, tracing.RUN, process.pid, (now, process.remaining_time, core.index))
+
+                if process.execution_history and process.execution_history[-1][1] == now:
+                    process.execution_history[-1] = (process.execution_history[-1][0], now + 1)
+                else:
+                    process.execution_history.append((now, now + 1))
+
+                if process.is_io_required(process.executed_time):
+                    if tracing_enabled:
+                        trace.emit(now, tracing.IO_START, process.pid)
+                    process.start_io()
+                    scheduler.block_process(process)
+                elif process.state == PCB.TERMINATED:
+                    if tracing_enabled:
+                        trace.emit(now, tracing.TERMINATE, process.pid)
+                    scheduler.terminate_process(process, now + 1)
+                    self.live_processes -= 1
+                    if stats is not None:
+                        stats.on_terminate(process)
+
+            if stats is not None:
+                for _ in range(busy):
+                    stats.on_run(now, now + 1)
+                if not busy:
+                    stats.on_idle(now, now + 1)
+
+            if self.live_processes == 0 and self._next_arrival_delay() is None:
+                if tracing_enabled:
+                    trace.emit(now, tracing.ALL_DONE)
+                self._finished = True
+                break
+
+            self.current_time += 1
+        return self._finished
+
+    def core_statistics(self):
+        """
+        每个CPU的统计
+
+        Returns:
+            列表, 每项为 {cpu, utilization, busy_ticks, migrations_in, steals}
+        """
+        return [{'cpu': core.index, 'utilization': core.utilization(), 'busy_ticks': core.busy_ticks,
+                 'migrations_in': core.migrations_in, 'steals': core.steals}
+                for core in self.cores]
+
+    def statistics(self):
+        """
+        在 TaskSimulator.statistics 的基础上增加多核统计
+
+        Returns:
+            字典, 另含 cpu_utilization (每个CPU的利用率列表)、migrations 和 steals
+        """
+        result = super().statistics()
+        result['cpu_utilization'] = [core.utilization() for core in self.cores]
+        result['migrations'] = self.migrations
+        result['steals'] = self.steals
+        return result
+
+    def _reset_scheduler(self):
+        """为每个CPU创建新的调度器"""
+        self.cores = [CPUCore(i, self.scheduler_factory()) for i in range(self.num_cpus)]
+        self.migrations = 0  # 负载均衡迁移的进程数
+        self.steals = 0
+
+    def _schedulers(self):
+        return [core.scheduler for core in self.cores]
+
+    def _sync_processes(self):
+        for core in self.cores:
+            scheduler = core.scheduler
+            scheduler.settle_waiting()
+            for process in scheduler.io_timer:
+                process.io_remaining = scheduler.io_remaining(process)
+
+    def _saved_state(self):
+        state = super()._saved_state()
+        state['cores'] = self.cores
+        state['counters'] = (self.migrations, self.steals)
+        return state
+
+    def _load_state(self, state):
+        super()._load_state(state)
+        self.cores = state['cores']
+        self.migrations, self.steals = state['counters']
+
+    def _switch_scheduler(self, scheduler):
+        """每个CPU换用 scheduler (调度器类或工厂函数) 创建的新调度器"""
+        self.scheduler_factory = scheduler
+        for core in self.cores:
+            replacement = scheduler()
+            replacement.import_state(*core.scheduler.export_state())
+            core.scheduler = replacement
+
+    def _admit_arrivals(self):
+        """把到达时间为当前时间的进程放到就绪进程最少的CPU上"""
+        arrivals = self._arrivals
+        while self._arrival_cursor < len(arrivals) and arrivals[self._arrival_cursor].arrival_time <= self.current_time:
+            process = arrivals[self._arrival_cursor]
+            self._arrival_cursor += 1
+            if process.arrival_time == self.current_time:
+                min(self.cores, key=lambda core: core.load).scheduler.add_process(process)
+                if self._tracing:
+                    self.trace.emit(self.current_time, tracing.ARRIVE, process.pid)
+
+    def _balance(self):
+        """周期负载均衡: 从最忙的CPU向最闲的CPU迁移进程, 直到就绪进程数相差不超过1"""
+        while True:
+            busiest = max(self.cores, key=lambda core: core.load)
+            idlest = min(self.cores, key=lambda core: core.load)
+            if busiest.load - idlest.load <= 1 or not self._migrate(busiest, idlest):
+                return
+            self.migrations += 1
+
+    def _steal(self, core):
+        """空闲的CPU从最忙的CPU窃取一个进程"""
+        victim = max(self.cores, key=lambda other: other.load)
+        if victim.load >= 2 and self._migrate(victim, core):
+            core.steals += 1
+            self.steals += 1
+
+    def _migrate(self, source, target):
+        """
+        把 source 运行队列末尾的一个进程 (不含刚在 source 上执行的进程) 迁移到 target
+
+        Returns:
+            是否迁移了进程
+        """
+        candidate = None
+        for process in source.scheduler.ready_queue:
+            if process is not source.current:
+                candidate = process
+        if candidate is None:
+            return False
+        source.scheduler.remove_process(candidate)
+        candidate.state = PCB.READY
+        target.scheduler.add_process(candidate)
+        target.migrations_in += 1
+        if self._tracing:
+            self.trace.emit(self.current_time, tracing.MIGRATE, candidate.pid, (source.index, target.index))
+        return True
@@ -0,0 +1,204 @@
+import math
+
+
+class QuantileSketch:
+    """
+    对数分桶的分位数草图 (DDSketch)
+
+    值 x 落入第 ceil(log(x) / log(gamma)) 个桶, gamma = (1 + a) / (1 - a),
+    用桶的代表值估计分位数时相对误差不超过 a (relative_accuracy)。
+    桶数超过 max_buckets 时合并最小的桶, 内存有上限, 只影响最低的分位数。
+    """
+
+    def __init__(self, relative_accuracy=0.01, max_buckets=2048):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets = {}  # 桶编号 -> 计数
+        self.zero_count = 0  # 不大于0的值
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """添加一个值, O(1)"""
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        if value <= 0:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        buckets = self.buckets
+        buckets[key] = buckets.get(key, 0) + 1
+        if len(buckets) > self.max_buckets:
+            lowest = min(buckets)
+            count = buckets.pop(lowest)
+            following = min(buckets)
+            buckets[following] += count
+
+    def quantile(self, q):
+        """第 q 分位数 (0 <= q <= 1) 的估计值, 没有数据时返回None"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return max(self.min, 0)
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def percentiles(self):
+        """{p50, p95, p99}"""
+        return {'p50': self.quantile(0.5), 'p95': self.quantile(0.95), 'p99': self.quantile(0.99)}
+
+
+class SlidingWindowCounter:
+    """
+    最近 window 个时间单位内的计数
+
+    窗口分成 buckets 个等宽的桶, 组成环形数组, 超出窗口的桶在被复用时清零,
+    内存和每次更新的开销都与运行时间无关。统计覆盖最近的若干个完整桶加上当前桶。
+    """
+
+    def __init__(self, window=1000, buckets=10):
+        self.width = max(1, window // buckets)
+        self.buckets = buckets
+        self._counts = [0] * buckets
+        self._ids = [-1] * buckets  # 每个槽位对应的桶编号
+
+    def _add_to_bucket(self, bucket, amount):
+        slot = bucket % self.buckets
+        if self._ids[slot] != bucket:
+            self._ids[slot] = bucket
+            self._counts[slot] = 0
+        self._counts[slot] += amount
+
+    def add(self, time, amount=1):
+        """在时间 time 计入 amount"""
+        self._add_to_bucket(time // self.width, amount)
+
+    def add_span(self, start, end):
+        """[start, end) 中的每个时间单位各计入1 (最多触及 buckets 个桶)"""
+        if end <= start:
+            return
+        width = self.width
+        last = (end - 1) // width
+        start = max(start, (last - self.buckets + 1) * width)
+        for bucket in range(start // width, last + 1):
+            low = max(start, bucket * width)
+            high = min(end, (bucket + 1) * width)
+            self._add_to_bucket(bucket, high - low)
+
+    def total(self, now):
+        """
+        截至时间 now (含) 的窗口内的计数
+
+        Returns:
+            (计数, 窗口覆盖的时间单位数)
+        """
+        current = now // self.width
+        oldest = current - self.buckets + 1
+        count = 0
+        for bucket, amount in zip(self._ids, self._counts):
+            if oldest <= bucket <= current:
+                count += amount
+        span = now + 1 - max(0, oldest * self.width)
+        return count, span
+
+
+class OnlineStatistics:
+    """
+    模拟过程中的在线统计
+
+    由 TaskSimulator 在每次执行、空闲和进程终止时调用, 每次 O(1),
+    任何时候都可以用 snapshot() 读取当前的数值, 无需遍历进程。
+    """
+
+    def __init__(self, window=1000, buckets=10, relative_accuracy=0.01):
+        """
+        Args:
+            window: 滑动窗口的长度 (时间单位), 用于CPU利用率和吞吐量
+            buckets: 滑动窗口分成的桶数
+            relative_accuracy: 分位数估计的相对误差
+        """
+        self.window = window
+        self.window_buckets = buckets
+        self.relative_accuracy = relative_accuracy
+        self.reset()
+
+    def reset(self):
+        """开始新一轮模拟时清空所有统计"""
+        self.time = -1  # 已经模拟到的最后一个时间单位
+        self.busy_ticks = 0
+        self.completed = 0
+        self.total_waiting = 0
+        self.total_turnaround = 0
+        self.total_response = 0
+        self.waiting = QuantileSketch(self.relative_accuracy)
+        self.turnaround = QuantileSketch(self.relative_accuracy)
+        self.response = QuantileSketch(self.relative_accuracy)
+        self._busy_window = SlidingWindowCounter(self.window, self.window_buckets)
+        self._completion_window = SlidingWindowCounter(self.window, self.window_buckets)
+
+    def on_run(self, start, end):
+        """CPU在 [start, end) 内执行进程"""
+        self.busy_ticks += end - start
+        self._busy_window.add_span(start, end)
+        self.time = end - 1
+
+    def on_idle(self, start, end):
+        """CPU在 [start, end) 内空闲"""
+        self.time = end - 1
+
+    def on_terminate(self, process):
+        """进程终止 (完成时间已设置)"""
+        turnaround = process.completion_time - process.arrival_time
+        self.completed += 1
+        self.total_waiting += process.waiting_time
+        self.total_turnaround += turnaround
+        self.waiting.add(process.waiting_time)
+        self.turnaround.add(turnaround)
+        if process.execution_history:
+            response = process.execution_history[0][0] - process.arrival_time
+            self.total_response += response
+            self.response.add(response)
+        self._completion_window.add(process.completion_time - 1)
+
+    def snapshot(self):
+        """
+        当前的统计数值
+
+        Returns:
+            字典 {time, completed, avg_waiting, avg_turnaround, avg_response,
+            waiting, turnaround, response (各为 {p50, p95, p99}),
+            utilization (整个运行期间), window_utilization, window_throughput (每时间单位完成数)}
+        """
+        completed = self.completed
+        elapsed = self.time + 1
+        result = {
+            'time': self.time,
+            'completed': completed,
+            'avg_waiting': self.total_waiting / completed if completed else 0,
+            'avg_turnaround': self.total_turnaround / completed if completed else 0,
+            'avg_response': self.total_response / completed if completed else 0,
+            'waiting': self.waiting.percentiles(),
+            'turnaround': self.turnaround.percentiles(),
+            'response': self.response.percentiles(),
+            'utilization': self.busy_ticks / elapsed if elapsed > 0 else 0,
+            'window_utilization': 0,
+            'window_throughput': 0,
+        }
+        if elapsed > 0:
+            busy, span = self._busy_window.total(self.time)
+            finished, _ = self._completion_window.total(self.time)
+            result['window_utilization'] = busy / span
+            result['window_throughput'] = finished / span
+        return result
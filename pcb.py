@@ -1,5 +1,16 @@
 class PCB:
-    """进程控制块 (Process Control Block)"""
+    """
+    进程控制块 (Process Control Block)
+
+    使用 __slots__ 省去实例字典, 对象本身 144 字节。加上 io_times 字典、
+    execution_history 列表和整数对象, create_random_processes 生成的进程
+    平均约 420 字节 (使用实例字典时约 480 字节), 其中大部分是 io_times 字典。
+    需要上百万进程时可以使用 process_table.ProcessTable 的列式存储。
+    """
+
+    __slots__ = ('pid', 'static_priority', 'dynamic_priority', 'burst_time', 'remaining_time',
+                 'io_times', 'arrival_time', 'state', 'executed_time', 'waiting_time',
+                 'io_remaining', 'completion_time', 'color', 'execution_history')
 
     # 进程状态
     READY = "Ready"
@@ -46,10 +57,15 @@ class PCB:
         self.io_remaining = self.io_times[self.executed_time]
         self.state = PCB.BLOCKED
 
-    def update_io(self):
+    def time_to_next_io(self):
+        """距下一个I/O触发点还需执行的时间单位数 (没有则返回None)"""
+        pending = [t - self.executed_time for t in self.io_times if t > self.executed_time]
+        return min(pending) if pending else None
+
+    def update_io(self, time_unit=1):
         """更新I/O操作时间"""
         if self.state == PCB.BLOCKED and self.io_remaining > 0:
-            self.io_remaining -= 1
+            self.io_remaining -= time_unit
             if self.io_remaining <= 0:
                 self.state = PCB.READY
 
@@ -65,7 +81,7 @@ class PCB:
 
         return exec_time
 
-    def update_waiting(self):
+    def update_waiting(self, time_unit=1):
         """更新等待时间"""
         if self.state == PCB.READY:
-            self.waiting_time += 1
\ No newline at end of file
+            self.waiting_time += time_unit
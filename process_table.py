@@ -0,0 +1,316 @@
+from array import array
+from bisect import bisect_left
+
+from pcb import PCB
+
+# 进程状态的整数编码
+STATE_READY = 0
+STATE_RUNNING = 1
+STATE_BLOCKED = 2
+STATE_TERMINATED = 3
+
+STATES = (PCB.READY, PCB.RUNNING, PCB.BLOCKED, PCB.TERMINATED)
+STATE_CODES = {state: code for code, state in enumerate(STATES)}
+
+
+class ProcessTable:
+    """
+    列式进程表 (struct-of-arrays)
+
+    每个字段一列 array, I/O 点按 CSR 格式压缩存储:
+    第 i 个进程的I/O点为 io_points[io_offsets[i]:io_offsets[i + 1]] (按执行时间升序),
+    对应的持续时间在 io_durations 的同一区间。
+
+    每个进程固定占用 77 字节 (pid 和两个优先级各 4 字节, 七个时间类字段各 8 字节,
+    状态 1 字节, CSR 偏移 8 字节), 每个I/O点另加 16 字节。create_random_processes
+    生成的负载存储约 110 字节/进程, PCB 对象约 420 字节/进程。访问过的行会缓存一个
+    ProcessRow 视图 (48 字节), TaskSimulator.use_process_table 会访问所有行,
+    加上进程列表和到达顺序列表, 交给模拟器后约 200 字节/进程, 约为 PCB 的一半。
+    执行历史只为执行过的进程保存, 颜色只在 from_processes(colors=True) 时保存。
+    """
+
+    def __init__(self):
+        self.pid = array('i')
+        self.static_priority = array('i')
+        self.dynamic_priority = array('i')
+        self.burst_time = array('q')
+        self.remaining_time = array('q')
+        self.arrival_time = array('q')
+        self.executed_time = array('q')
+        self.waiting_time = array('q')
+        self.io_remaining = array('q')
+        self.completion_time = array('q')
+        self.state = array('b')
+        self.io_offsets = array('q', [0])
+        self.io_points = array('q')
+        self.io_durations = array('q')
+        self.histories = {}  # 行号 -> 执行历史, 只保存执行过的进程
+        self.colors = {}  # 行号 -> 颜色
+        self._rows = []  # 缓存的行视图, 保证同一行总是同一个对象
+
+    def __len__(self):
+        return len(self.pid)
+
+    def append(self, pid, priority, burst_time, io_times=None, arrival_time=0):
+        """添加一个进程, 返回行号"""
+        self.pid.append(pid)
+        self.static_priority.append(priority)
+        self.dynamic_priority.append(priority)
+        self.burst_time.append(burst_time)
+        self.remaining_time.append(burst_time)
+        self.arrival_time.append(arrival_time)
+        self.executed_time.append(0)
+        self.waiting_time.append(0)
+        self.io_remaining.append(0)
+        self.completion_time.append(0)
+        self.state.append(STATE_READY)
+        for point in sorted(io_times or {}):
+            self.io_points.append(point)
+            self.io_durations.append(io_times[point])
+        self.io_offsets.append(len(self.io_points))
+        self._rows.append(None)
+        return len(self.pid) - 1
+
+    @classmethod
+    def from_processes(cls, processes, colors=False):
+        """
+        从PCB列表构造进程表
+
+        Args:
+            colors: 是否复制进程的颜色 (可视化用, 每个进程另需约 60 字节)
+        """
+        table = cls()
+        for process in processes:
+            index = table.append(process.pid, process.static_priority, process.burst_time,
+                                 process.io_times, process.arrival_time)
+            if colors and process.color is not None:
+                table.colors[index] = process.color
+        return table
+
+    @classmethod
+    def from_columns(cls, pid, priority, burst_time, arrival_time, io_offsets=None, io_points=(), io_durations=()):
+        """
+        按列批量构造进程表
+
+        各列为整数序列 (array、列表或 numpy 数组, numpy 数组整块复制, 不逐个转换),
+        I/O 点为 CSR 格式, 每个进程的I/O点须按执行时间升序且不重复; io_offsets 为None表示没有I/O。
+        """
+        n = len(pid)
+        table = cls()
+        table.pid = _column('i', pid)
+        table.static_priority = _column('i', priority)
+        table.dynamic_priority = array('i', table.static_priority)
+        table.burst_time = _column('q', burst_time)
+        table.remaining_time = array('q', table.burst_time)
+        table.arrival_time = _column('q', arrival_time)
+        zeros = array('q', [0]) * n
+        table.executed_time = zeros
+        table.waiting_time = array('q', zeros)
+        table.io_remaining = array('q', zeros)
+        table.completion_time = array('q', zeros)
+        table.state = array('b', [STATE_READY]) * n
+        table.io_offsets = _column('q', io_offsets) if io_offsets is not None else array('q', [0]) * (n + 1)
+        table.io_points = _column('q', io_points)
+        table.io_durations = _column('q', io_durations)
+        if not (len(table.static_priority) == len(table.burst_time) == len(table.arrival_time) == n and
+                len(table.io_offsets) == n + 1 and len(table.io_points) == len(table.io_durations)):
+            raise ValueError("各列的长度不一致")
+        table._rows = [None] * n
+        return table
+
+    def row(self, index):
+        """第 index 行的视图, 可以像PCB一样交给调度器和模拟器使用"""
+        row = self._rows[index]
+        if row is None:
+            row = self._rows[index] = ProcessRow(self, index)
+        return row
+
+    def rows(self):
+        """所有行的视图列表"""
+        return [self.row(index) for index in range(len(self))]
+
+    def to_pcb(self, index):
+        """把一行复制成独立的PCB对象"""
+        start, end = self.io_offsets[index], self.io_offsets[index + 1]
+        io_times = dict(zip(self.io_points[start:end], self.io_durations[start:end]))
+        process = PCB(self.pid[index], self.static_priority[index], self.burst_time[index],
+                      io_times, self.arrival_time[index])
+        process.color = self.colors.get(index)
+        return process
+
+    def io_duration(self, index, executed_time):
+        """进程在执行到 executed_time 时的I/O持续时间 (该点没有I/O时返回None)"""
+        start, end = self.io_offsets[index], self.io_offsets[index + 1]
+        pos = bisect_left(self.io_points, executed_time, start, end)
+        if pos < end and self.io_points[pos] == executed_time:
+            return self.io_durations[pos]
+        return None
+
+    def next_io_point(self, index, executed_time):
+        """进程在 executed_time 之后的第一个I/O点 (没有则返回None)"""
+        start, end = self.io_offsets[index], self.io_offsets[index + 1]
+        pos = bisect_left(self.io_points, executed_time + 1, start, end)
+        return self.io_points[pos] if pos < end else None
+
+    def nbytes(self):
+        """所有列占用的字节数 (不含缓存的行视图和执行历史)"""
+        columns = (self.pid, self.static_priority, self.dynamic_priority, self.burst_time,
+                   self.remaining_time, self.arrival_time, self.executed_time, self.waiting_time,
+                   self.io_remaining, self.completion_time, self.state, self.io_offsets,
+                   self.io_points, self.io_durations)
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def as_numpy(self):
+        """
+        以 numpy 数组的形式零拷贝访问各列 (需要安装 numpy)
+
+        返回的数组与进程表共享内存, 数组存在期间不能再向表中添加进程。
+        """
+        import numpy as np
+
+        names = ('pid', 'static_priority', 'dynamic_priority', 'burst_time', 'remaining_time',
+                 'arrival_time', 'executed_time', 'waiting_time', 'io_remaining',
+                 'completion_time', 'state', 'io_offsets', 'io_points', 'io_durations')
+        columns = {}
+        for name in names:
+            column = getattr(self, name)
+            columns[name] = np.frombuffer(column, dtype=np.dtype(column.typecode))
+        return columns
+
+
+def _column(typecode, values):
+    """把整数序列转换为 array, numpy 数组按字节整块复制"""
+    if hasattr(values, 'astype'):
+        column = array(typecode)
+        column.frombytes(values.astype(typecode, copy=False).tobytes())
+        return column
+    return array(typecode, values)
+
+
+class _UnsavedHistory(list):
+    """还没有执行记录的行的执行历史 (空列表), 第一次追加时才保存到进程表"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        super().__init__()
+        self._table = table
+        self._index = index
+
+    def append(self, item):
+        list.append(self, item)
+        self._table.histories[self._index] = self
+
+    def extend(self, items):
+        list.extend(self, items)
+        if self:
+            self._table.histories[self._index] = self
+
+    def __reduce__(self):
+        # 复制和序列化时为普通列表, 不带上整个进程表
+        return list, (list(self),)
+
+
+def _column_property(name):
+    """把行视图的属性映射到进程表的某一列"""
+
+    def getter(self):
+        return getattr(self._table, name)[self._index]
+
+    def setter(self, value):
+        getattr(self._table, name)[self._index] = value
+
+    return property(getter, setter)
+
+
+class ProcessRow:
+    """
+    进程表中一行的视图
+
+    只保存表和行号, 提供与PCB相同的属性和方法, 所以现有的调度器和模拟器
+    可以直接在进程表上运行。
+    """
+
+    __slots__ = ('_table', '_index')
+
+    READY = PCB.READY
+    RUNNING = PCB.RUNNING
+    BLOCKED = PCB.BLOCKED
+    TERMINATED = PCB.TERMINATED
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    pid = _column_property('pid')
+    static_priority = _column_property('static_priority')
+    dynamic_priority = _column_property('dynamic_priority')
+    burst_time = _column_property('burst_time')
+    remaining_time = _column_property('remaining_time')
+    arrival_time = _column_property('arrival_time')
+    executed_time = _column_property('executed_time')
+    waiting_time = _column_property('waiting_time')
+    io_remaining = _column_property('io_remaining')
+    completion_time = _column_property('completion_time')
+
+    @property
+    def index(self):
+        """行号"""
+        return self._index
+
+    @property
+    def state(self):
+        return STATES[self._table.state[self._index]]
+
+    @state.setter
+    def state(self, value):
+        self._table.state[self._index] = STATE_CODES[value]
+
+    @property
+    def io_times(self):
+        """I/O点的字典副本 {时间点: 持续时间}"""
+        table = self._table
+        start, end = table.io_offsets[self._index], table.io_offsets[self._index + 1]
+        return dict(zip(table.io_points[start:end], table.io_durations[start:end]))
+
+    @property
+    def execution_history(self):
+        history = self._table.histories.get(self._index)
+        return history if history is not None else _UnsavedHistory(self._table, self._index)
+
+    @execution_history.setter
+    def execution_history(self, value):
+        if value:
+            self._table.histories[self._index] = value
+        else:
+            self._table.histories.pop(self._index, None)
+
+    @property
+    def color(self):
+        return self._table.colors.get(self._index)
+
+    @color.setter
+    def color(self, value):
+        self._table.colors[self._index] = value
+
+    def is_io_required(self, current_time):
+        """检查当前时间是否需要I/O操作"""
+        return (self._table.state[self._index] == STATE_RUNNING and
+                self._table.io_duration(self._index, self.executed_time) is not None)
+
+    def start_io(self):
+        """开始I/O操作"""
+        self.io_remaining = self._table.io_duration(self._index, self.executed_time)
+        self.state = PCB.BLOCKED
+
+    def time_to_next_io(self):
+        """距下一个I/O触发点还需执行的时间单位数 (没有则返回None)"""
+        executed = self.executed_time
+        point = self._table.next_io_point(self._index, executed)
+        return point - executed if point is not None else None
+
+    # 其余行为与PCB完全相同
+    update_dynamic_priority = PCB.update_dynamic_priority
+    update_io = PCB.update_io
+    execute = PCB.execute
+    update_waiting = PCB.update_waiting
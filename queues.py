@@ -0,0 +1,461 @@
+import heapq
+from itertools import count
+
+from pcb import PCB
+
+
+class _Node:
+    """ProcessQueue 的链表节点"""
+
+    __slots__ = ('prev', 'next', 'process')
+
+    def __init__(self, process=None):
+        self.prev = self
+        self.next = self
+        self.process = process
+
+
+class ProcessQueue:
+    """
+    先进先出的进程队列 (带 pid -> 节点索引的双向链表)
+
+    入队、出队、成员判断、删除中间的进程以及把进程移到队尾都是 O(1),
+    接口与原来使用的列表保持一致 (append / remove / in / 遍历)。
+    """
+
+    def __init__(self, processes=()):
+        self._head = _Node()  # 哨兵节点, head.next 为队首
+        self._index = {}  # pid -> 节点
+        for process in processes:
+            self.append(process)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __bool__(self):
+        return bool(self._index)
+
+    def __contains__(self, process):
+        node = self._index.get(process.pid)
+        return node is not None and node.process is process
+
+    def __iter__(self):
+        node = self._head.next
+        while node is not self._head:
+            # 先取出后继节点, 允许遍历时删除当前进程
+            next_node = node.next
+            yield node.process
+            node = next_node
+
+    def append(self, process):
+        """进程加入队尾"""
+        node = _Node(process)
+        tail = self._head.prev
+        node.prev = tail
+        node.next = self._head
+        tail.next = node
+        self._head.prev = node
+        self._index[process.pid] = node
+
+    def remove(self, process):
+        """删除任意位置的进程, 进程不在队列中时抛出ValueError"""
+        if process not in self:
+            raise ValueError(f"进程 {process.pid} 不在队列中")
+        node = self._index.pop(process.pid)
+        node.prev.next = node.next
+        node.next.prev = node.prev
+
+    def move_to_end(self, process):
+        """把队列中的进程移到队尾"""
+        self.remove(process)
+        self.append(process)
+
+    def splice(self, other):
+        """把另一个队列的全部进程按原顺序接到队尾, other 随后为空"""
+        if not other:
+            return
+        first = other._head.next
+        last = other._head.prev
+        tail = self._head.prev
+        tail.next = first
+        first.prev = tail
+        last.next = self._head
+        self._head.prev = last
+        self._index.update(other._index)
+        other.clear()
+
+    def pids(self):
+        """队列中所有进程的pid"""
+        return self._index.keys()
+
+    def peek(self):
+        """返回队首进程, 队列为空时返回None"""
+        return self._head.next.process
+
+    def popleft(self):
+        """弹出队首进程"""
+        if not self._index:
+            raise IndexError("队列为空")
+        process = self._head.next.process
+        self.remove(process)
+        return process
+
+    def clear(self):
+        self._head = _Node()
+        self._index = {}
+
+    def __getstate__(self):
+        # 按顺序保存进程列表, 避免 pickle 沿链表逐个节点递归
+        return list(self)
+
+    def __setstate__(self, processes):
+        self.__init__(processes)
+
+
+class IndexedPriorityQueue:
+    """
+    带位置索引的二叉堆就绪队列
+
+    按 (key(process), 入队序号) 排序, 键值相同时先入队的进程在前,
+    与对列表做稳定排序的结果一致。通过 pid -> 堆位置 的索引,
+    插入、弹出、删除任意进程和更新键值都是 O(log n)。
+    """
+
+    def __init__(self, key):
+        """
+        Args:
+            key: 从进程计算排序键的函数 (数字小 = 优先)
+        """
+        self.key = key
+        self._heap = []  # 堆元素: [键值, 入队序号, 进程], 入队序号唯一, 比较不会落到进程上
+        self._index = {}  # pid -> 在堆中的位置
+        self._counter = count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __bool__(self):
+        return bool(self._heap)
+
+    def __contains__(self, process):
+        pos = self._index.get(process.pid)
+        return pos is not None and self._heap[pos][2] is process
+
+    def __iter__(self):
+        """按堆内存储顺序遍历进程 (不保证有序)"""
+        return (entry[2] for entry in self._heap)
+
+    def append(self, process):
+        """插入进程 (与列表接口保持一致)"""
+        if process in self:
+            self.update(process)
+            return
+        entry = [self.key(process), next(self._counter), process]
+        self._heap.append(entry)
+        self._index[process.pid] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def remove(self, process):
+        """删除任意位置的进程, 进程不在队列中时抛出ValueError"""
+        if process not in self:
+            raise ValueError(f"进程 {process.pid} 不在就绪队列中")
+        self._remove_at(self._index[process.pid])
+
+    def update(self, process):
+        """进程的排序键改变后重新调整其位置 (保留入队序号)"""
+        pos = self._index[process.pid]
+        entry = self._heap[pos]
+        entry[0] = self.key(process)
+        self._sift_up(pos)
+        self._sift_down(self._index[process.pid])
+
+    def peek(self):
+        """返回排在最前的进程, 队列为空时返回None"""
+        return self._heap[0][2] if self._heap else None
+
+    def ordered(self):
+        """按出队顺序排列的所有进程, O(n log n)"""
+        return [entry[2] for entry in sorted(self._heap)]
+
+    def pop(self):
+        """弹出排在最前的进程"""
+        if not self._heap:
+            raise IndexError("就绪队列为空")
+        process = self._heap[0][2]
+        self._remove_at(0)
+        return process
+
+    def clear(self):
+        self._heap = []
+        self._index = {}
+
+    def __getstate__(self):
+        # itertools.count 不再支持 pickle, 改存下一个入队序号
+        state = self.__dict__.copy()
+        state['_counter'] = next(self._counter)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._counter = count(state['_counter'])
+
+    def _remove_at(self, pos):
+        last = self._heap.pop()
+        del self._index[last[2].pid]
+        if pos < len(self._heap):
+            removed = self._heap[pos]
+            del self._index[removed[2].pid]
+            self._heap[pos] = last
+            self._index[last[2].pid] = pos
+            self._sift_up(pos)
+            self._sift_down(self._index[last[2].pid])
+
+    def _sift_up(self, pos):
+        heap = self._heap
+        entry = heap[pos]
+        while pos > 0:
+            parent = (pos - 1) >> 1
+            if heap[parent] <= entry:
+                break
+            heap[pos] = heap[parent]
+            self._index[heap[pos][2].pid] = pos
+            pos = parent
+        heap[pos] = entry
+        self._index[entry[2].pid] = pos
+
+    def _sift_down(self, pos):
+        heap = self._heap
+        size = len(heap)
+        entry = heap[pos]
+        while True:
+            child = 2 * pos + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            heap[pos] = heap[child]
+            self._index[heap[pos][2].pid] = pos
+            pos = child
+        heap[pos] = entry
+        self._index[entry[2].pid] = pos
+
+
+class IOTimer:
+    """
+    按I/O完成时间排序的阻塞队列 (最小堆)
+
+    每个时间单位只弹出到期的进程, 不再逐个递减 io_remaining;
+    剩余I/O时间由完成时间和当前时钟计算得出。完成时间相同的进程按阻塞的先后顺序唤醒。
+    """
+
+    def __init__(self):
+        self.now = 0  # 已推进的时间单位数
+        self._heap = []  # 堆元素: (完成时间, 阻塞序号, 进程)
+        self._deadline = {}  # pid -> 完成时间
+        self._stalled = []  # I/O持续时间不为正的进程, 永远不会完成
+        self._counter = count()
+
+    def __len__(self):
+        return len(self._heap) + len(self._stalled)
+
+    def __bool__(self):
+        return bool(self._heap) or bool(self._stalled)
+
+    def __iter__(self):
+        """按完成时间遍历阻塞进程"""
+        for _, _, process in sorted(self._heap):
+            yield process
+        yield from self._stalled
+
+    def add(self, process, duration):
+        """进程开始一次持续 duration 个时间单位的I/O"""
+        if duration <= 0:
+            self._stalled.append(process)
+            return
+        deadline = self.now + duration
+        self._deadline[process.pid] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), process))
+
+    def advance(self, ticks=1):
+        """时钟前进 ticks 个时间单位, 返回这段时间内完成I/O的进程"""
+        self.now += ticks
+        done = []
+        while self._heap and self._heap[0][0] <= self.now:
+            process = heapq.heappop(self._heap)[2]
+            del self._deadline[process.pid]
+            done.append(process)
+        return done
+
+    def next_delay(self):
+        """距下一次I/O完成还需的时间单位数 (没有则返回None)"""
+        return self._heap[0][0] - self.now if self._heap else None
+
+    def remaining(self, process):
+        """进程剩余的I/O时间"""
+        deadline = self._deadline.get(process.pid)
+        return deadline - self.now if deadline is not None else process.io_remaining
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_counter'] = next(self._counter)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._counter = count(state['_counter'])
+
+
+class WaitingTimer:
+    """
+    惰性累计就绪进程的等待时间
+
+    只记录进程以就绪状态进入就绪队列时的时钟, 被选中执行 (stop) 或 settle 时才把
+    经过的时间单位数加到 waiting_time 上, 每个时间单位只需推进时钟, 不再遍历就绪队列。
+    与逐个时间单位调用 PCB.update_waiting 的结果相同: 进入就绪队列的时间单位和被选中的
+    时间单位都计入等待时间, 执行过又留在队列中的进程 (状态为运行) 不累计。
+    """
+
+    def __init__(self):
+        self.now = 0  # 已推进的时间单位数
+        self._since = {}  # pid -> (进程, 开始累计时的时钟)
+
+    def __len__(self):
+        return len(self._since)
+
+    def advance(self, ticks=1):
+        self.now += ticks
+
+    def start(self, process):
+        """进程进入就绪队列, 状态为就绪时从当前时钟开始累计"""
+        if process.state == PCB.READY:
+            self._since[process.pid] = (process, self.now)
+
+    def stop(self, process):
+        """进程开始执行或离开就绪队列, 结算其等待时间"""
+        entry = self._since.pop(process.pid, None)
+        if entry is not None:
+            process.waiting_time += self.now - entry[1]
+
+    def settle(self):
+        """把所有进程已累计的等待时间写回PCB, 继续累计"""
+        now = self.now
+        for pid, (process, since) in self._since.items():
+            process.waiting_time += now - since
+            self._since[pid] = (process, now)
+
+
+class AgingReadyQueue:
+    """
+    惰性老化的就绪队列 (每个静态优先级一个先进先出的桶)
+
+    只记录进程进入就绪队列的时间, 有效优先级在需要时按
+    max(1, static_priority - 等待时间 // aging_factor) 计算, 不再每个时间单位遍历队列。
+    同一个桶里先入队的进程等得最久, 有效优先级也最高, 所以选择时只需比较各个桶的队首。
+    正在执行的进程也算在队列中, 但不老化; 只有其他进程的有效优先级严格更高时才会被抢占,
+    被抢占的进程重新排到所在桶的末尾, 从下一个时间单位开始重新老化。
+    """
+
+    def __init__(self, aging_factor):
+        self.aging_factor = aging_factor
+        self.clock = 0  # 已经过的时间单位数
+        self.running = None  # 正在执行的进程
+        self._buckets = {}  # 静态优先级 -> ProcessQueue
+        self._entries = {}  # pid -> (入队时间, 入队时的等待时间)
+
+    def __len__(self):
+        return len(self._entries) + (self.running is not None)
+
+    def __bool__(self):
+        return self.running is not None or bool(self._entries)
+
+    def __contains__(self, process):
+        if process is self.running:
+            return True
+        bucket = self._buckets.get(process.static_priority)
+        return bucket is not None and process in bucket
+
+    def __iter__(self):
+        if self.running is not None:
+            yield self.running
+        for priority in sorted(self._buckets):
+            yield from self._buckets[priority]
+
+    def append(self, process):
+        """进程进入就绪队列, 从当前时间单位开始累计等待时间"""
+        bucket = self._buckets.get(process.static_priority)
+        if bucket is None:
+            bucket = self._buckets[process.static_priority] = ProcessQueue()
+        bucket.append(process)
+        self._entries[process.pid] = (self.clock, process.waiting_time)
+
+    def remove(self, process):
+        """删除进程, 进程不在队列中时抛出ValueError"""
+        if process is self.running:
+            self.running = None
+            return
+        if process not in self:
+            raise ValueError(f"进程 {process.pid} 不在就绪队列中")
+        self._settle(process)
+        self._buckets[process.static_priority].remove(process)
+        del self._entries[process.pid]
+
+    def effective_priority(self, process):
+        """等待中的进程当前的有效优先级"""
+        waited = self.clock - self._entries[process.pid][0]
+        return max(1, process.static_priority - waited // self.aging_factor)
+
+    def select(self):
+        """选出下一个执行的进程, 并把其等待时间和动态优先级写回PCB"""
+        best = None
+        best_key = None
+        for priority, bucket in self._buckets.items():
+            if not bucket:
+                continue
+            head = bucket.peek()
+            key = (self.effective_priority(head), self._entries[head.pid][0], priority)
+            if best_key is None or key < best_key:
+                best, best_key = head, key
+
+        current = self.running
+        if current is not None:
+            # 并列时当前进程继续执行
+            if best is None or best_key[0] >= current.dynamic_priority:
+                return current
+            current.state = PCB.READY
+            self.running = None
+            self.append(current)
+
+        if best is not None:
+            self.remove(best)
+            self.running = best
+        return best
+
+    def ticks_until_preempted(self):
+        """正在执行的进程在没有外部事件时还能连续执行的时间单位数 (None表示不会被抢占)"""
+        current = self.running
+        if current is None or current.dynamic_priority <= 1:
+            return None
+        horizon = None
+        for bucket in self._buckets.values():
+            if not bucket:
+                continue
+            head = bucket.peek()
+            # 有效优先级降到当前进程之下所需的等待时间
+            needed = (head.static_priority - current.dynamic_priority + 1) * self.aging_factor
+            delay = max(1, needed - (self.clock - self._entries[head.pid][0]))
+            if horizon is None or delay < horizon:
+                horizon = delay
+        return horizon
+
+    def settle(self):
+        """把所有等待中进程惰性累计的等待时间和动态优先级写回PCB"""
+        for bucket in self._buckets.values():
+            for process in bucket:
+                self._settle(process)
+
+    def _settle(self, process):
+        enqueue_time, base_waiting = self._entries[process.pid]
+        process.waiting_time = base_waiting + self.clock - enqueue_time
+        process.dynamic_priority = self.effective_priority(process)
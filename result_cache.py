@@ -0,0 +1,231 @@
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+from collections import OrderedDict
+
+from simulator import TaskSimulator
+
+# 缓存格式或模拟语义变化时加一, 使旧的磁盘缓存失效
+CACHE_VERSION = 1
+
+_PROCESS = struct.Struct('<5q')
+
+# 模拟结束后保存的进程字段
+_RESULT_FIELDS = ('state', 'remaining_time', 'executed_time', 'waiting_time', 'io_remaining',
+                  'completion_time', 'dynamic_priority', 'execution_history')
+
+
+def workload_digest(processes):
+    """
+    工作负载的稳定哈希 (SHA-256 十六进制串)
+
+    覆盖每个进程的 pid、优先级、执行时间、到达时间和 io_times, 按列表顺序计算
+    (到达时间相同的进程按列表顺序入队, 顺序不同结果可能不同)。
+    """
+    digest = hashlib.sha256()
+    for process in processes:
+        io_times = sorted(process.io_times.items())
+        digest.update(_PROCESS.pack(process.pid, process.static_priority, process.burst_time,
+                                    process.arrival_time, len(io_times)))
+        for io_time, io_duration in io_times:
+            digest.update(_PROCESS.pack(io_time, io_duration, 0, 0, 0))
+    return digest.hexdigest()
+
+
+def scheduler_config(scheduler):
+    """调度器的类和参数, 调度器没有 parameters 方法或 parameters() 返回None时返回None (不可缓存)"""
+    parameters = getattr(scheduler, 'parameters', None)
+    values = parameters() if parameters is not None else None
+    if values is None:
+        return None
+    cls = type(scheduler)
+    return f"{cls.__module__}.{cls.__qualname__}{sorted(values.items())!r}"
+
+
+class ResultCache:
+    """
+    以内容寻址的模拟结果缓存
+
+    键为工作负载、调度器类和参数以及最大模拟时间的哈希, 值为模拟结束时的执行历史、
+    各进程的结果和统计数据 (pickle 字节串)。事件驱动模式与逐时间单位模拟结果相同, 不计入键。
+    内存中按最近使用顺序保留 max_entries 项; 指定 directory 时另有磁盘缓存,
+    每项一个文件, 总大小超过 max_disk_bytes 时删除最久未使用的文件, 可供多个进程共享。
+    磁盘总大小在启动时扫描一次, 之后按写入量累加, 只在超过上限时重新扫描目录
+    (其他进程写入的文件在下次扫描时计入)。
+
+    流式输入、多核模拟和不声明参数的调度器 (parameters() 返回None, 包括未覆盖该方法的自定义子类)
+    不缓存, 直接运行模拟。
+    命中时不运行模拟, 因此不会产生跟踪事件和在线统计, 调度器的队列也不会更新。
+    """
+
+    def __init__(self, max_entries=128, directory=None, max_disk_bytes=256 * 2 ** 20):
+        """
+        Args:
+            max_entries: 内存中保留的结果数
+            directory: 磁盘缓存目录, None表示只使用内存
+            max_disk_bytes: 磁盘缓存的总大小上限 (字节)
+        """
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # 键 -> pickle 字节串, 最近使用的在末尾
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._disk_bytes = 0  # 磁盘缓存的估计总大小
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(size for _, _, size in self._disk_entries())
+
+    def key(self, simulator, max_time):
+        """模拟器当前的工作负载和调度器对应的键, 不可缓存时返回None"""
+        if type(simulator) is not TaskSimulator or simulator._stream is not None:
+            return None
+        config = scheduler_config(simulator.scheduler)
+        if config is None:
+            return None
+        digest = hashlib.sha256(f"{CACHE_VERSION}|{config}|{max_time}|".encode())
+        digest.update(workload_digest(simulator.processes).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """按键取出缓存的字节串, 未命中时返回None"""
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            return data
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # 记录最近使用时间, 供淘汰使用
+        except OSError:
+            return None
+        self.disk_hits += 1
+        self._remember(key, data)
+        return data
+
+    def put(self, key, data):
+        """保存字节串"""
+        self._remember(key, data)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        try:
+            self._disk_bytes -= os.path.getsize(path)  # 覆盖已有的文件
+        except OSError:
+            pass
+        # 先写临时文件再改名, 其他进程不会读到写了一半的文件
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self._disk_bytes += len(data)
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def load(self, simulator, max_time):
+        """
+        命中时把缓存的结果写入模拟器 (进程状态、执行历史和当前时间)
+
+        Returns:
+            缓存的统计数据 (TaskSimulator.statistics() 的结果), 未命中时返回None
+        """
+        key = self.key(simulator, max_time)
+        data = self.get(key) if key is not None else None
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        result = pickle.loads(data)
+        simulator.current_time = result['current_time']
+        simulator.execution_history = result['execution_history']
+        for process, values in zip(simulator.processes, result['processes']):
+            for field, value in zip(_RESULT_FIELDS, values):
+                setattr(process, field, value)
+        return result['statistics']
+
+    def store(self, simulator, max_time):
+        """保存模拟器刚运行完的结果 (不可缓存时忽略)"""
+        key = self.key(simulator, max_time)
+        if key is None:
+            return
+        result = {
+            'current_time': simulator.current_time,
+            'execution_history': simulator.execution_history,
+            'processes': [tuple(getattr(process, field) for field in _RESULT_FIELDS)
+                          for process in simulator.processes],
+            'statistics': simulator.statistics(),
+        }
+        self.put(key, pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+
+    def run_simulation(self, simulator, max_time=100, event_driven=False):
+        """
+        命中时直接返回缓存的结果, 否则运行模拟并保存结果
+
+        Returns:
+            模拟器的统计数据
+        """
+        statistics = self.load(simulator, max_time)
+        if statistics is None:
+            simulator.run_simulation(max_time, event_driven=event_driven)
+            statistics = simulator.statistics()
+            if not simulator._stop_requested:
+                self.store(simulator, max_time)
+        return statistics
+
+    def clear(self):
+        """清空内存和磁盘缓存"""
+        self._memory.clear()
+        self._disk_bytes = 0
+        if self.directory is None:
+            return
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pkl'):
+                os.unlink(entry.path)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pkl')
+
+    def _remember(self, key, data):
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_entries(self):
+        """磁盘缓存文件的 (最近使用时间, 路径, 大小) 列表"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.pkl'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue  # 已被其他进程删除
+            entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def _evict_disk(self):
+        """重新扫描目录, 磁盘缓存超过上限时按最近使用时间从旧到新删除"""
+        entries = self._disk_entries()
+        total = sum(size for _, _, size in entries)
+        if total > self.max_disk_bytes:
+            entries.sort()
+            for _, path, size in entries:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+                total -= size
+                if total <= self.max_disk_bytes:
+                    break
+        self._disk_bytes = total
@@ -1,36 +1,85 @@
+from operator import attrgetter
+
 from pcb import PCB
+from queues import AgingReadyQueue, IndexedPriorityQueue, IOTimer, ProcessQueue, WaitingTimer
 
 
 class Scheduler:
     """所有调度器的基类"""
 
     def __init__(self):
-        self.ready_queue = []
-        self.blocked_queue = []
+        self.ready_queue = self._create_ready_queue()
+        self.io_timer = IOTimer()  # 阻塞队列, 按I/O完成时间排序
+        self.waiting = WaitingTimer()  # 就绪进程的等待时间
+        self.terminated_processes = []
+
+    def _create_ready_queue(self):
+        """创建就绪队列 (子类可替换为其他队列结构)"""
+        return ProcessQueue()
+
+    def parameters(self):
+        """
+        影响调度结果的构造参数 (用于 result_cache 的缓存键)
+
+        返回None表示不可缓存。子类可能有未列出的参数, 因此基类不缓存, 内置调度器各自声明参数。
+        """
+        return None
+
+    def reset(self):
+        """清空所有队列, 用于开始新一轮模拟"""
+        self.ready_queue = self._create_ready_queue()
+        self.io_timer = IOTimer()
+        self.waiting = WaitingTimer()
         self.terminated_processes = []
 
+    @property
+    def blocked_queue(self):
+        """所有阻塞进程的列表 (按I/O完成时间排序)"""
+        return list(self.io_timer)
+
+    @property
+    def ready_count(self):
+        """就绪进程总数"""
+        return len(self.ready_queue)
+
+    def io_remaining(self, process):
+        """阻塞进程剩余的I/O时间"""
+        return self.io_timer.remaining(process)
+
     def add_process(self, process):
         """添加新进程到就绪队列"""
         if process.state == PCB.READY and process not in self.ready_queue:
             self.ready_queue.append(process)
+            self.waiting.start(process)
+
+    def remove_process(self, process):
+        """把就绪进程移出调度器 (迁移到其他CPU), 进程不在就绪队列中时抛出ValueError"""
+        self.ready_queue.remove(process)
+        self.waiting.stop(process)
+
+    def start_running(self, process):
+        """get_next_process 选中的进程开始执行 (由模拟器调用), 结算其等待时间"""
+        self.waiting.stop(process)
 
     def block_process(self, process):
         """将进程移至阻塞队列"""
         if process in self.ready_queue:
             self.ready_queue.remove(process)
         process.state = PCB.BLOCKED
-        self.blocked_queue.append(process)
+        self.io_timer.add(process, process.io_remaining)
 
-    def unblock_processes(self):
+    def unblock_processes(self, time_unit=1):
         """检查并解除阻塞完成I/O的进程"""
-        still_blocked = []
-        for process in self.blocked_queue:
-            process.update_io()
-            if process.state == PCB.READY:
-                self.ready_queue.append(process)
-            else:
-                still_blocked.append(process)
-        self.blocked_queue = still_blocked
+        # 只处理在这段时间内I/O到期的进程
+        for process in self.io_timer.advance(time_unit):
+            process.io_remaining = 0
+            process.state = PCB.READY
+            self.ready_queue.append(process)
+            self.waiting.start(process)
+
+    def next_unblock_delay(self):
+        """距下一次I/O完成还需的时间单位数 (没有则返回None)"""
+        return self.io_timer.next_delay()
 
     def terminate_process(self, process, current_time):
         """将进程标记为终止状态"""
@@ -44,40 +93,134 @@ class Scheduler:
         """获取下一个要执行的进程 (子类必须实现)"""
         raise NotImplementedError("子类必须实现get_next_process方法")
 
-    def update_queues(self):
-        """更新队列中进程的状态"""
-        for process in self.ready_queue:
-            process.update_waiting()
+    def update_queues(self, time_unit=1):
+        """更新队列中进程的状态 (等待时间惰性累计, 只推进时钟)"""
+        self.waiting.advance(time_unit)
+
+    def stable_ticks(self, process):
+        """
+        在没有外部事件 (到达、I/O完成、阻塞、终止) 的情况下,
+        get_next_process 还会连续返回 process 多少个时间单位 (含当前时间单位)
+
+        返回None表示不受调度器本身限制
+        """
+        return None
+
+    def fast_forward(self, process, ticks):
+        """批量推进调度器状态, 等价于再调用 ticks 次返回 process 的 get_next_process"""
+        pass
+
+    def settle_waiting(self):
+        """把惰性累计的等待时间写回PCB (读取统计数据前调用)"""
+        self.waiting.settle()
+
+    def export_state(self):
+        """
+        导出队列中的进程, 用于换用另一个调度器继续模拟 (见 TaskSimulator.fork)
+
+        Returns:
+            (按队列顺序排列的就绪进程, [(阻塞进程, 剩余I/O时间), ...], 已终止进程)
+        """
+        self.settle_waiting()
+        ready = self.ready_queue
+        ready = ready.ordered() if isinstance(ready, IndexedPriorityQueue) else list(ready)
+        blocked = [(process, self.io_remaining(process)) for process in self.io_timer]
+        return ready, blocked, list(self.terminated_processes)
+
+    def import_state(self, ready, blocked, terminated):
+        """清空队列后接管 export_state 导出的进程, 进程状态保持不变"""
+        self.reset()
+        for process in ready:
+            self.ready_queue.append(process)
+            self.waiting.start(process)
+        for process, remaining in blocked:
+            self.io_timer.add(process, remaining)
+        self.terminated_processes = list(terminated)
+
+
+class FCFSScheduler(Scheduler):
+    """先来先服务调度"""
+
+    def parameters(self):
+        return {}
+
+    def get_next_process(self):
+        return self.ready_queue.peek()
 
 
 class PriorityScheduler(Scheduler):
     """静态优先级调度"""
 
-    def get_next_process(self):
-        if not self.ready_queue:
-            return None
+    def parameters(self):
+        return {}
 
+    def _create_ready_queue(self):
         # 按静态优先级排序 (数字小 = 优先级高)
-        self.ready_queue.sort(key=lambda p: p.static_priority)
-        return self.ready_queue[0]
+        return IndexedPriorityQueue(key=attrgetter('static_priority'))
+
+    def get_next_process(self):
+        return self.ready_queue.peek()
 
 
 class DynamicPriorityScheduler(Scheduler):
     """动态优先级调度"""
 
-    def __init__(self, aging_factor=3):
-        super().__init__()
+    def __init__(self, aging_factor=3, lazy_aging=False):
+        """
+        Args:
+            aging_factor: 每等待多少个时间单位优先级提高1
+            lazy_aging: 是否使用惰性老化。开启后只记录进程进入就绪队列的时间,
+                按需计算有效优先级, 不再每个时间单位遍历并排序就绪队列;
+                老化从每次进入就绪队列时重新开始, 被抢占的进程也会重新累计等待时间
+        """
         self.aging_factor = aging_factor
+        self.lazy_aging = lazy_aging
+        super().__init__()
+
+    def parameters(self):
+        return {'aging_factor': self.aging_factor, 'lazy_aging': self.lazy_aging}
 
-    def update_queues(self):
+    def _create_ready_queue(self):
+        if self.lazy_aging:
+            return AgingReadyQueue(self.aging_factor)
+        # 动态优先级的并列顺序依赖每个时间单位的稳定排序结果, 保留列表
+        return []
+
+    def update_queues(self, time_unit=1):
         """更新等待时间和动态优先级"""
-        super().update_queues()
+        if self.lazy_aging:
+            # 等待时间由入队时间推算, 只需推进时钟
+            self.ready_queue.clock += time_unit
+            return
 
-        # 根据等待时间更新优先级
+        # 老化需要每个时间单位的等待时间, 逐个累计 (不推进 self.waiting 的时钟, 它结算的等待时间为0)
         for process in self.ready_queue:
+            process.update_waiting(time_unit)
             process.update_dynamic_priority(self.aging_factor)
 
+    def stable_ticks(self, process):
+        """老化会改变其他就绪进程的优先级, 只能推进到下一次优先级变化之前"""
+        if self.lazy_aging:
+            return self.ready_queue.ticks_until_preempted()
+
+        horizon = None
+        for other in self.ready_queue:
+            # 正在执行的进程不累计等待时间, 优先级已降到1的进程不会再变化
+            if other is process or other.state != PCB.READY or other.dynamic_priority <= 1:
+                continue
+            delay = self.aging_factor - other.waiting_time % self.aging_factor
+            if horizon is None or delay < horizon:
+                horizon = delay
+        return horizon
+
+    def settle_waiting(self):
+        if self.lazy_aging:
+            self.ready_queue.settle()
+
     def get_next_process(self):
+        if self.lazy_aging:
+            return self.ready_queue.select()
+
         if not self.ready_queue:
             return None
 
@@ -95,6 +238,9 @@ class RoundRobinScheduler(Scheduler):
         self.current_process = None
         self.time_used = 0
 
+    def parameters(self):
+        return {'time_quantum': self.time_quantum}
+
     def get_next_process(self):
         if not self.ready_queue:
             self.current_process = None
@@ -107,86 +253,339 @@ class RoundRobinScheduler(Scheduler):
                 self.time_used >= self.time_quantum):
 
             # 如果当前进程仍在就绪队列中，移至队列末尾
-            if self.current_process in self.ready_queue:
-                self.ready_queue.remove(self.current_process)
-                self.ready_queue.append(self.current_process)
+            if self.current_process is not None and self.current_process in self.ready_queue:
+                self.ready_queue.move_to_end(self.current_process)
 
             # 选择队首进程
-            self.current_process = self.ready_queue[0]
+            self.current_process = self.ready_queue.peek()
             self.time_used = 0
 
         self.time_used += 1
         return self.current_process
 
+    def reset(self):
+        super().reset()
+        self.current_process = None
+        self.time_used = 0
+
+    def stable_ticks(self, process):
+        """时间片用完前当前进程保持不变"""
+        if process is not self.current_process:
+            return 1
+        return max(1, self.time_quantum - self.time_used + 1)
+
+    def fast_forward(self, process, ticks):
+        """累计已用时间片"""
+        self.time_used += ticks
+
 
 class SJFScheduler(Scheduler):
     """短作业优先调度"""
 
-    def get_next_process(self):
-        if not self.ready_queue:
-            return None
+    def parameters(self):
+        return {}
 
+    def _create_ready_queue(self):
         # 按总执行时间排序
-        self.ready_queue.sort(key=lambda p: p.burst_time)
-        return self.ready_queue[0]
+        return IndexedPriorityQueue(key=attrgetter('burst_time'))
+
+    def get_next_process(self):
+        return self.ready_queue.peek()
 
 
 class SRTFScheduler(Scheduler):
     """短剩余时间优先调度"""
 
+    def __init__(self):
+        super().__init__()
+        self.last_selected = None
+
+    def parameters(self):
+        return {}
+
+    def _create_ready_queue(self):
+        # 按剩余执行时间排序
+        return IndexedPriorityQueue(key=attrgetter('remaining_time'))
+
+    def reset(self):
+        super().reset()
+        self.last_selected = None
+
+    def get_next_process(self):
+        # 只有上一次选中的进程执行过, 其剩余时间需要更新到堆中
+        if self.last_selected is not None and self.last_selected in self.ready_queue:
+            self.ready_queue.update(self.last_selected)
+        self.last_selected = self.ready_queue.peek()
+        return self.last_selected
+
+
+# CFS 的权重: 近似 Linux 的 sched_prio_to_weight, nice 值每差1权重约差1.25倍
+CFS_NICE_0_WEIGHT = 1024
+CFS_WEIGHTS = tuple(round(CFS_NICE_0_WEIGHT / 1.25 ** nice) for nice in range(-20, 20))  # nice -20 到 19
+CFS_NICE_0_PRIORITY = 5  # 静态优先级为该值的进程 nice 值为0, 数字每小1 nice 值小1
+
+# 虚拟运行时间的单位: nice 值为0的进程执行一个时间单位增加的虚拟运行时间
+CFS_VRUNTIME_TICK = 1024
+
+
+def cfs_weight(process):
+    """按静态优先级计算进程的 CFS 权重"""
+    nice = min(max(process.static_priority - CFS_NICE_0_PRIORITY, -20), 19)
+    return CFS_WEIGHTS[nice + 20]
+
+
+class CFSScheduler(Scheduler):
+    """
+    完全公平调度 (仿 Linux CFS)
+
+    每个进程执行一个时间单位, 虚拟运行时间增加 CFS_VRUNTIME_TICK * 1024 / 权重 (整数),
+    权重由静态优先级决定 (见 cfs_weight), 优先级高的进程虚拟运行时间增长得慢。
+    就绪队列按 (虚拟运行时间, 入队序号) 排序, 选择、重新插入和删除都是 O(log n)。
+
+    选中的进程执行一个时间片后才重新选择虚拟运行时间最小的进程, 时间片为
+    max(min_granularity, 调度周期 * 权重 / 就绪进程总权重), 调度周期为
+    max(target_latency, 就绪进程数 * min_granularity)。新到达或I/O完成的进程不抢占当前时间片。
+    新进程 (包括迁移来的进程) 从队列的最小虚拟运行时间开始; I/O完成的进程最多获得
+    target_latency / 2 的补偿, 不会因为长时间阻塞而独占CPU。
+    """
+
+    def __init__(self, target_latency=16, min_granularity=2):
+        """
+        Args:
+            target_latency: 调度周期 (时间单位), 就绪进程不多时每个进程在一个周期内至少执行一次
+            min_granularity: 最短时间片 (时间单位)
+        """
+        if not 1 <= min_granularity <= target_latency:
+            raise ValueError("时间片参数无效")
+        self.target_latency = target_latency
+        self.min_granularity = min_granularity
+        super().__init__()
+        self._reset_state()
+
+    def parameters(self):
+        return {'target_latency': self.target_latency, 'min_granularity': self.min_granularity}
+
+    def _create_ready_queue(self):
+        # 绑定方法可以 pickle, 快照时随调度器一起保存
+        return IndexedPriorityQueue(key=self._vruntime_key)
+
+    def _vruntime_key(self, process):
+        return self.vruntime[process.pid]
+
+    def _reset_state(self):
+        self.vruntime = {}  # pid -> 虚拟运行时间 (含阻塞中的进程)
+        self.min_vruntime = 0  # 单调不减, 新进程和I/O完成的进程以此为基准
+        self.total_weight = 0  # 就绪进程 (含正在执行的进程) 的权重之和
+        self.current_process = None
+        self.time_slice = 0
+        self.time_used = 0
+
+    def reset(self):
+        super().reset()
+        self._reset_state()
+
+    def _enqueue(self, process):
+        self.ready_queue.append(process)
+        self.waiting.start(process)
+        self.total_weight += cfs_weight(process)
+
+    def _dequeue(self, process):
+        """从就绪队列中移除 (进程不在队列中时忽略)"""
+        if process in self.ready_queue:
+            self.ready_queue.remove(process)
+            self.waiting.stop(process)
+            self.total_weight -= cfs_weight(process)
+        if process is self.current_process:
+            self.current_process = None
+            self.time_used = 0
+
+    def add_process(self, process):
+        """新进程从最小虚拟运行时间开始"""
+        if process.state == PCB.READY and process not in self.ready_queue:
+            self.vruntime.setdefault(process.pid, self.min_vruntime)
+            self._enqueue(process)
+
+    def remove_process(self, process):
+        if process not in self.ready_queue:
+            raise ValueError(f"进程 {process.pid} 不在就绪队列中")
+        self._dequeue(process)
+        del self.vruntime[process.pid]
+
+    def block_process(self, process):
+        self._dequeue(process)
+        process.state = PCB.BLOCKED
+        self.io_timer.add(process, process.io_remaining)
+
+    def unblock_processes(self, time_unit=1):
+        credit = self.target_latency * CFS_VRUNTIME_TICK // 2
+        for process in self.io_timer.advance(time_unit):
+            process.io_remaining = 0
+            process.state = PCB.READY
+            vruntime = self.vruntime.get(process.pid, self.min_vruntime)
+            self.vruntime[process.pid] = max(vruntime, self.min_vruntime - credit)
+            self._enqueue(process)
+
+    def terminate_process(self, process, current_time):
+        self._dequeue(process)
+        self.vruntime.pop(process.pid, None)
+        process.state = PCB.TERMINATED
+        process.completion_time = current_time
+        self.terminated_processes.append(process)
+
+    def import_state(self, ready, blocked, terminated):
+        """接管的就绪进程按原队列顺序从相同的虚拟运行时间开始"""
+        super().import_state([], blocked, terminated)
+        for process in ready:
+            self.vruntime[process.pid] = self.min_vruntime
+            self._enqueue(process)
+
+    def time_slice_of(self, process):
+        """进程被选中时获得的时间片"""
+        period = max(self.target_latency, self.ready_count * self.min_granularity)
+        return max(self.min_granularity, period * cfs_weight(process) // self.total_weight)
+
     def get_next_process(self):
         if not self.ready_queue:
+            self.current_process = None
+            self.time_used = 0
             return None
 
-        # 按剩余执行时间排序
-        self.ready_queue.sort(key=lambda p: p.remaining_time)
-        return self.ready_queue[0]
+        # 当前进程的时间片用完 (或已不在就绪队列中) 时选择虚拟运行时间最小的进程
+        if (self.current_process is None or
+                self.current_process not in self.ready_queue or
+                self.time_used >= self.time_slice):
+            self.current_process = self.ready_queue.peek()
+            self.time_slice = self.time_slice_of(self.current_process)
+            self.time_used = 0
+
+        self.time_used += 1
+        self._charge(self.current_process, 1)
+        return self.current_process
+
+    def _charge(self, process, ticks):
+        """选中的进程将执行 ticks 个时间单位, 增加其虚拟运行时间并重新插入队列"""
+        # 先取整再乘, 一次推进多个时间单位与逐个时间单位推进的结果相同
+        self.vruntime[process.pid] += ticks * (CFS_VRUNTIME_TICK * CFS_NICE_0_WEIGHT // cfs_weight(process))
+        self.ready_queue.update(process)
+        leftmost = self.vruntime[self.ready_queue.peek().pid]
+        if leftmost > self.min_vruntime:
+            self.min_vruntime = leftmost
+
+    def stable_ticks(self, process):
+        """时间片用完前当前进程保持不变"""
+        if process is not self.current_process:
+            return 1
+        return max(1, self.time_slice - self.time_used + 1)
+
+    def fast_forward(self, process, ticks):
+        """累计已用时间片和虚拟运行时间"""
+        self.time_used += ticks
+        self._charge(process, ticks)
+
+
+class MLFQReadyView:
+    """MLFQ 各级就绪队列的只读视图 (不复制队列)"""
+
+    def __init__(self, scheduler):
+        self._scheduler = scheduler
+
+    def __len__(self):
+        return self._scheduler.ready_count
+
+    def __bool__(self):
+        return self._scheduler.ready_count > 0
+
+    def __contains__(self, process):
+        return process.pid in self._scheduler.level_of
+
+    def __iter__(self):
+        """按级别从高到低遍历所有就绪进程"""
+        for queue in self._scheduler.queues:
+            yield from queue
 
 
 class MLFQScheduler:
     """多级反馈队列调度"""
 
-    def __init__(self, time_quantum=2, num_queues=3):
-        self.queues = [[] for _ in range(num_queues)]  # 多级队列
-        self.blocked_queue = []
-        self.terminated_processes = []
+    def __init__(self, time_quantum=2, num_queues=3, boost_interval=None):
+        """
+        Args:
+            time_quantum: 最高级队列的时间片, 每降一级时间片翻倍
+            num_queues: 队列级数
+            boost_interval: 每隔多少个时间单位把所有就绪进程提升回最高级队列 (None表示不提升)
+        """
         self.num_queues = num_queues
         self.base_quantum = time_quantum
+        self.boost_interval = boost_interval
+        self.reset()
+
+    def parameters(self):
+        """影响调度结果的构造参数 (用于 result_cache 的缓存键)"""
+        return {'time_quantum': self.base_quantum, 'num_queues': self.num_queues,
+                'boost_interval': self.boost_interval}
+
+    def reset(self):
+        """清空所有队列, 用于开始新一轮模拟"""
+        self.queues = [ProcessQueue() for _ in range(self.num_queues)]  # 多级队列
+        self.level_of = {}  # pid -> 所在队列级别
+        self.io_timer = IOTimer()  # 阻塞队列, 按I/O完成时间排序
+        self.waiting = WaitingTimer()  # 就绪进程的等待时间
+        self.terminated_processes = []
         self.current_process = None
         self.time_used = 0
         self.current_level = 0
+        self.clock = 0  # 已经过的时间单位数
+        self.next_boost = self.boost_interval
 
     @property
     def ready_queue(self):
-        """所有就绪进程的平面列表"""
-        result = []
-        for queue in self.queues:
-            result.extend(queue)
-        return result
-
-    @ready_queue.setter
-    def ready_queue(self, value):
-        """处理队列清空操作"""
-        if not value:
-            for i in range(self.num_queues):
-                self.queues[i] = []
+        """所有就绪进程的只读视图"""
+        return MLFQReadyView(self)
+
+    @property
+    def ready_count(self):
+        """就绪进程总数"""
+        return len(self.level_of)
+
+    @property
+    def blocked_queue(self):
+        """所有阻塞进程的列表 (按I/O完成时间排序)"""
+        return list(self.io_timer)
+
+    def io_remaining(self, process):
+        """阻塞进程剩余的I/O时间"""
+        return self.io_timer.remaining(process)
 
     def add_process(self, process):
         """添加新进程到最高优先级队列"""
-        if process.state == PCB.READY:
-            # 确保进程不在任何队列中
-            for queue in self.queues:
-                if process in queue:
-                    return
+        if process.state == PCB.READY and process.pid not in self.level_of:
             self.queues[0].append(process)
+            self.level_of[process.pid] = 0
+            self.waiting.start(process)
+
+    def remove_process(self, process):
+        """把就绪进程移出调度器 (迁移到其他CPU), 进程不在就绪队列中时抛出ValueError"""
+        if process.pid not in self.level_of:
+            raise ValueError(f"进程 {process.pid} 不在就绪队列中")
+        self._remove_from_queue(process)
+        if process is self.current_process:
+            self.current_process = None
+            self.time_used = 0
+
+    def start_running(self, process):
+        """get_next_process 选中的进程开始执行 (由模拟器调用), 结算其等待时间"""
+        self.waiting.stop(process)
+
+    def _remove_from_queue(self, process):
+        """从进程所在级别的队列中移除"""
+        level = self.level_of.pop(process.pid, None)
+        if level is not None:
+            self.queues[level].remove(process)
+            self.waiting.stop(process)
 
     def block_process(self, process):
         """将进程移至阻塞队列"""
-        # 从当前所在队列移除
-        for level in range(self.num_queues):
-            if process in self.queues[level]:
-                self.queues[level].remove(process)
-                break
+        self._remove_from_queue(process)
 
         # 如果是当前执行的进程，重置状态
         if process == self.current_process:
@@ -194,27 +593,25 @@ class MLFQScheduler:
             self.time_used = 0
 
         process.state = PCB.BLOCKED
-        self.blocked_queue.append(process)
+        self.io_timer.add(process, process.io_remaining)
 
-    def unblock_processes(self):
+    def unblock_processes(self, time_unit=1):
         """处理阻塞队列中的进程"""
-        still_blocked = []
-        for process in self.blocked_queue:
-            process.update_io()
-            if process.state == PCB.READY:
-                # I/O完成后进程回到最高优先级队列
-                self.queues[0].append(process)
-            else:
-                still_blocked.append(process)
-        self.blocked_queue = still_blocked
+        for process in self.io_timer.advance(time_unit):
+            # I/O完成后进程回到最高优先级队列
+            process.io_remaining = 0
+            process.state = PCB.READY
+            self.queues[0].append(process)
+            self.level_of[process.pid] = 0
+            self.waiting.start(process)
+
+    def next_unblock_delay(self):
+        """距下一次I/O完成还需的时间单位数 (没有则返回None)"""
+        return self.io_timer.next_delay()
 
     def terminate_process(self, process, current_time):
         """终止进程"""
-        # 从所有队列中查找并移除
-        for level in range(self.num_queues):
-            if process in self.queues[level]:
-                self.queues[level].remove(process)
-                break
+        self._remove_from_queue(process)
 
         # 如果是当前进程，重置状态
         if process == self.current_process:
@@ -225,16 +622,65 @@ class MLFQScheduler:
         process.completion_time = current_time
         self.terminated_processes.append(process)
 
-    def update_queues(self):
-        """更新所有队列中进程的等待时间"""
-        for level in range(self.num_queues):
-            for process in self.queues[level]:
-                process.update_waiting()
+    def boost_priorities(self):
+        """把所有就绪进程按原有顺序整体提升到最高级队列"""
+        top = self.queues[0]
+        for level in range(1, self.num_queues):
+            queue = self.queues[level]
+            if queue:
+                self.level_of.update(dict.fromkeys(queue.pids(), 0))
+                top.splice(queue)
+        self.current_level = 0
+
+    def update_queues(self, time_unit=1):
+        """执行到期的优先级提升, 推进等待时间的时钟"""
+        if self.boost_interval:
+            # 本次推进覆盖的时间单位中到达提升周期的, 依次执行提升
+            while self.next_boost < self.clock + time_unit:
+                self.boost_priorities()
+                self.next_boost += self.boost_interval
+        self.clock += time_unit
+        self.waiting.advance(time_unit)
+
+    def stable_ticks(self, process):
+        """当前级别的时间片用完 (或到达下一次提升) 前当前进程保持不变"""
+        if process is not self.current_process:
+            return 1
+        current_quantum = self.base_quantum * (2 ** self.current_level)
+        horizon = current_quantum - self.time_used + 1
+        if self.boost_interval:
+            horizon = min(horizon, self.next_boost - self.clock + 1)
+        return max(1, horizon)
+
+    def fast_forward(self, process, ticks):
+        """累计已用时间片"""
+        self.time_used += ticks
+
+    def settle_waiting(self):
+        """把惰性累计的等待时间写回PCB"""
+        self.waiting.settle()
+
+    def export_state(self):
+        """导出队列中的进程, 格式同 Scheduler.export_state"""
+        self.settle_waiting()
+        blocked = [(process, self.io_remaining(process)) for process in self.io_timer]
+        return list(self.ready_queue), blocked, list(self.terminated_processes)
+
+    def import_state(self, ready, blocked, terminated):
+        """清空队列后接管其他调度器导出的进程, 就绪进程都进入最高级队列"""
+        self.reset()
+        for process in ready:
+            self.queues[0].append(process)
+            self.level_of[process.pid] = 0
+            self.waiting.start(process)
+        for process, remaining in blocked:
+            self.io_timer.add(process, remaining)
+        self.terminated_processes = list(terminated)
 
     def get_next_process(self):
         """获取下一个要执行的进程"""
         # 检查是否有进程存在
-        if not any(self.queues):
+        if not self.level_of:
             self.current_process = None
             self.time_used = 0
             return None
@@ -246,13 +692,12 @@ class MLFQScheduler:
         if (self.current_process is None or self.time_used >= current_quantum):
             # 如果有当前进程且时间片用完，降级
             if (self.current_process is not None and self.time_used >= current_quantum):
-                # 找到进程所在队列并降级
-                for level in range(self.num_queues):
-                    if self.current_process in self.queues[level]:
-                        self.queues[level].remove(self.current_process)
-                        next_level = min(level + 1, self.num_queues - 1)
-                        self.queues[next_level].append(self.current_process)
-                        break
+                level = self.level_of.get(self.current_process.pid)
+                if level is not None:
+                    self.queues[level].remove(self.current_process)
+                    next_level = min(level + 1, self.num_queues - 1)
+                    self.queues[next_level].append(self.current_process)
+                    self.level_of[self.current_process.pid] = next_level
 
             # 重置状态并从最高优先级队列开始查找新进程
             self.current_process = None
@@ -260,7 +705,7 @@ class MLFQScheduler:
 
             for level in range(self.num_queues):
                 if self.queues[level]:
-                    self.current_process = self.queues[level][0]
+                    self.current_process = self.queues[level].peek()
                     self.current_level = level
                     break
 
@@ -268,4 +713,4 @@ class MLFQScheduler:
         if self.current_process:
             self.time_used += 1
 
-        return self.current_process
\ No newline at end of file
+        return self.current_process
@@ -1,15 +1,43 @@
+import copy
+import pickle
 import random
+import time
 from pcb import PCB
+from timeline import ExecutionTimeline, TimelineFileWriter
+import tracing
 
 
 class TaskSimulator:
     """任务调度模拟器"""
 
-    def __init__(self, scheduler):
+    def __init__(self, scheduler, trace=None, stats=None, profiler=None):
+        """
+        Args:
+            scheduler: 调度器实例
+            trace: 跟踪输出 (tracing.TraceSink), 默认不输出;
+                使用 tracing.PrintTraceSink() 可逐条打印到控制台
+            stats: 在线统计 (online_stats.OnlineStatistics), 默认不统计;
+                运行期间可随时调用 stats.snapshot() 读取当前数值
+            profiler: 调度阶段的计时 (profiling.SimulationProfiler), 默认不计时
+        """
         self.scheduler = scheduler
+        self.trace = trace or tracing.NullTraceSink()
+        self.stats = stats
+        self.profiler = profiler
+        self._stop_requested = False
+        self._tracing = False
+        self._event_driven = False
+        self._finished = False  # 所有进程都已完成, advance 不再推进
         self.current_time = 0
         self.processes = []
-        self.execution_history = []  # 格式: [(time, pid, state), ...]
+        self.execution_history = ExecutionTimeline()  # 按时间单位迭代得到 (time, pid, state)
+        self.live_processes = 0  # 尚未终止的进程数
+        self._arrivals = []  # 按到达时间排序的进程
+        self._arrival_cursor = 0
+        self._stream = None  # 流式输入的进程, 见 stream_processes
+        self._pending = None  # 流中下一个尚未到达的进程
+        self._live = {}  # 流式模式下尚未终止的进程 (按接纳顺序)
+        self._retired = [0, 0, 0, 0]  # 流式模式下已终止进程的 [数量, 等待, 周转, 响应] 合计
         self.colors = ['#FF5733', '#33FF57', '#5733FF', '#FF33A8',
                        '#33A8FF', '#A8FF33', '#FF8C33', '#8C33FF',
                        '#33FFEC', '#EC33FF', '#FFEC33', '#33ECFF']
@@ -18,6 +46,7 @@ class TaskSimulator:
                                 max_io_ops=3, max_io_duration=5):
         """创建随机进程"""
         self.processes = []
+        self._stream = None
 
         for i in range(num_processes):
             # 随机生成进程参数
@@ -49,10 +78,59 @@ class TaskSimulator:
         process.color = self.colors[len(self.processes) % len(self.colors)]
         self.processes.append(process)
 
-    def run_simulation(self, max_time=100):
-        """运行模拟"""
-        self.execution_history = []
+    def use_process_table(self, table):
+        """使用列式进程表 (process_table.ProcessTable) 中的进程"""
+        self.processes = table.rows()
+        self._stream = None
+
+    def stream_processes(self, source):
+        """
+        从按到达时间排序的进程流中读取进程 (例如 workload.read_csv 的结果)
+
+        模拟时间到达进程的到达时间时才从流中取出该进程, 进程终止后只保留统计合计,
+        不再保留进程本身, 所以内存只与同时存活的进程数有关, 与流的长度无关。
+        模拟结束后 processes 中只有尚未终止的进程。流只能被运行一次。
+        """
+        self.processes = []
+        self._stream = iter(source)
+
+    def run_simulation(self, max_time=100, event_driven=False, history=None):
+        """
+        运行模拟
+
+        Args:
+            max_time: 最大模拟时间
+            event_driven: 是否使用离散事件模式。该模式在两次事件 (到达、I/O完成、
+                时间片用完、I/O触发、进程终止) 之间直接跳过, 执行历史和进程统计
+                与逐时间单位模拟完全一致
+            history: 记录执行历史的对象, 默认为新的 timeline.ExecutionTimeline;
+                传入 timeline.TimelineFileWriter 可在运行时直接写入磁盘 (由调用者关闭)
+        """
+        self.start(event_driven, history)
+        self.advance(max_time)
+        return self.finish()
+
+    def start(self, event_driven=False, history=None):
+        """
+        开始新一轮模拟 (重置进程和调度器), 之后用 advance 分段推进, 最后调用 finish
+
+        参数含义同 run_simulation。
+        """
+        self.execution_history = ExecutionTimeline() if history is None else history
         self.current_time = 0
+        self._stop_requested = False
+        self._event_driven = event_driven
+        self._finished = False
+        self._tracing = self.trace.enabled
+        if self.stats is not None:
+            self.stats.reset()
+
+        # 流式模式: 进程在到达时才从流中取出
+        if self._stream is not None:
+            self.processes = []
+            self._live = {}
+            self._retired = [0, 0, 0, 0]
+            self._pending = next(self._stream, None)
 
         # 重置所有进程状态
         for process in self.processes:
@@ -66,33 +144,43 @@ class TaskSimulator:
             process.execution_history = []
 
         # 重置调度器队列
-        if hasattr(self.scheduler, 'queues'):  # 多级反馈队列
-            self.scheduler.queues = [[] for _ in range(self.scheduler.num_queues)]
-            self.scheduler.blocked_queue = []
-            self.scheduler.terminated_processes = []
-            self.scheduler.current_process = None
-            self.scheduler.time_used = 0
-            self.scheduler.current_level = 0
-        else:  # 其他调度器
-            self.scheduler.ready_queue = []
-            self.scheduler.blocked_queue = []
-            self.scheduler.terminated_processes = []
-            if hasattr(self.scheduler, 'current_process'):
-                self.scheduler.current_process = None
-                self.scheduler.time_used = 0
-
-        # 添加初始到达的进程
-        for process in self.processes:
-            if process.arrival_time == 0:
-                self.scheduler.add_process(process)
+        self._reset_scheduler()
+
+        # 按到达时间排序, 用游标依次接纳到达的进程
+        self._arrivals = sorted(self.processes, key=lambda p: p.arrival_time)
+        self._arrival_cursor = 0
+        self.live_processes = len(self.processes)
+
+    def advance(self, until):
+        """
+        推进模拟, 直到当前时间到达 until (不含) 或所有进程都已完成
+
+        分多次调用 advance 与一次运行到相同的 max_time 结果完全一致,
+        两次调用之间可以用 snapshot 保存模拟状态。
 
+        Returns:
+            所有进程是否都已完成
+        """
+        profiler = self.profiler
+        if profiler is None:
+            return self._advance(until)
+        profiler.attach(self, self._schedulers())
+        start = time.perf_counter_ns()
+        try:
+            return self._advance(until)
+        finally:
+            profiler.record_loop(time.perf_counter_ns() - start)
+            profiler.detach()
+
+    def _advance(self, until):
+        trace = self.trace
+        tracing_enabled = self._tracing
+        stats = self.stats
+        event_driven = self._event_driven
         # 主模拟循环
-        while self.current_time < max_time:
+        while self.current_time < until and not self._stop_requested and not self._finished:
             # 添加新到达的进程
-            for process in self.processes:
-                if process.arrival_time == self.current_time and process.state != PCB.READY and process.state != PCB.RUNNING:
-                    self.scheduler.add_process(process)
-                    print(f"时间 {self.current_time}: 进程 {process.pid} 到达")
+            self._admit_arrivals()
 
             # 处理I/O完成的进程
             self.scheduler.unblock_processes()
@@ -109,61 +197,307 @@ class TaskSimulator:
 
             # 执行进程
             if current_process:
-                # 确保状态正确
+                # 确保状态正确 (先结算被选中前的等待时间)
+                self.scheduler.start_running(current_process)
                 current_process.state = PCB.RUNNING
 
-                # 执行一个时间单位
-                current_process.execute(1)
+                # 连续执行的时间单位数, 中间的时间单位一次性推进
+                ticks = self._run_length(current_process, until) if event_driven else 1
+                self._skip_ticks(current_process, ticks - 1)
+                start_time = self.current_time
+                current_process.execute(ticks)
+                self.current_time += ticks - 1
 
                 # 记录执行历史
-                self.execution_history.append((self.current_time, current_process.pid, current_process.state))
-                print(
-                    f"时间 {self.current_time}: 执行进程 {current_process.pid}, 剩余时间: {current_process.remaining_time}")
+                self.execution_history.append_run(start_time, self.current_time, current_process.pid, PCB.RUNNING)
+                self.execution_history.append(self.current_time, current_process.pid, current_process.state)
+                if tracing_enabled:
+                    trace.emit(self.current_time, tracing.RUN, current_process.pid,
+                               (start_time, current_process.remaining_time))
 
                 # 更新进程执行历史
-                if current_process.execution_history and current_process.execution_history[-1][1] == self.current_time:
+                if current_process.execution_history and current_process.execution_history[-1][1] == start_time:
                     # 合并连续执行段
-                    start_time = current_process.execution_history[-1][0]
-                    current_process.execution_history[-1] = (start_time, self.current_time + 1)
+                    segment_start = current_process.execution_history[-1][0]
+                    current_process.execution_history[-1] = (segment_start, self.current_time + 1)
                 else:
-                    current_process.execution_history.append((self.current_time, self.current_time + 1))
+                    current_process.execution_history.append((start_time, self.current_time + 1))
+                if stats is not None:
+                    stats.on_run(start_time, self.current_time + 1)
 
                 # 检查是否需要I/O
                 if current_process.is_io_required(current_process.executed_time):
-                    print(f"时间 {self.current_time}: 进程 {current_process.pid} 开始I/O操作")
+                    if tracing_enabled:
+                        trace.emit(self.current_time, tracing.IO_START, current_process.pid)
                     current_process.start_io()
                     self.scheduler.block_process(current_process)
 
                 # 检查进程是否完成
                 elif current_process.state == PCB.TERMINATED:
-                    print(f"时间 {self.current_time}: 进程 {current_process.pid} 完成")
+                    if tracing_enabled:
+                        trace.emit(self.current_time, tracing.TERMINATE, current_process.pid)
                     self.scheduler.terminate_process(current_process, self.current_time + 1)
+                    self.live_processes -= 1
+                    if stats is not None:
+                        stats.on_terminate(current_process)
+                    if self._stream is not None:
+                        self._retire(current_process)
             else:
                 # 没有进程执行
-                self.execution_history.append((self.current_time, None, None))
-                print(f"时间 {self.current_time}: CPU空闲")
+                ticks = self._idle_length(until) if event_driven else 1
+                self._skip_ticks(None, ticks - 1)
+                start_time = self.current_time
+                self.current_time += ticks - 1
+                self.execution_history.append_run(start_time, self.current_time + 1, None, None)
+                if stats is not None:
+                    stats.on_idle(start_time, self.current_time + 1)
+                if tracing_enabled:
+                    trace.emit(self.current_time, tracing.IDLE, data=start_time)
 
             # 检查是否所有进程都已完成
-            all_terminated = all(p.state == PCB.TERMINATED for p in self.processes)
-            if all_terminated:
-                print("所有进程已完成")
+            if self.live_processes == 0 and self._next_arrival_delay() is None:
+                if tracing_enabled:
+                    trace.emit(self.current_time, tracing.ALL_DONE)
+                self._finished = True
                 break
 
             # 时间前进
             self.current_time += 1
+        return self._finished
 
-        # 打印每个进程的执行情况
-        print(f"模拟结束, 总时间: {self.current_time}")
-        for process in self.processes:
-            print(f"进程 {process.pid}: 执行历史={process.execution_history}, 完成时间={process.completion_time}")
-            if not process.execution_history:
-                print(
-                    f"  注意: 进程 {process.pid} 未执行 (优先级:{process.static_priority}, 到达时间:{process.arrival_time})")
+    def finish(self):
+        """结束模拟: 输出汇总跟踪, 把调度器中的状态写回进程, 返回执行历史"""
+        trace = self.trace
+        tracing_enabled = self._tracing
+
+        if self._stream is not None:
+            self.processes = list(self._live)
+
+        # 输出每个进程的执行情况
+        if tracing_enabled:
+            trace.emit(self.current_time, tracing.END)
+            for process in self.processes:
+                trace.emit(self.current_time, tracing.SUMMARY, process.pid,
+                           (list(process.execution_history), process.completion_time,
+                            process.static_priority, process.arrival_time))
 
+        self._sync_processes()
         for process in self.processes:
             if process.remaining_time <= 0 and process.state != PCB.TERMINATED:
                 process.state = PCB.TERMINATED
                 if process.completion_time == 0:  # 如果还没有设置完成时间
                     process.completion_time = self.current_time
 
-        return self.execution_history
\ No newline at end of file
+        return self.execution_history
+
+    def stop(self):
+        """请求停止正在运行的模拟 (可在其他线程中调用), 当前时间单位结束后生效"""
+        self._stop_requested = True
+
+    def snapshot(self):
+        """
+        保存当前的模拟状态 (进程、调度器队列、执行历史、在线统计等, 不含跟踪输出)
+
+        在两次 advance 之间调用。状态用 pickle 序列化为字节串, 与模拟器不共享任何对象,
+        可以保存到文件, 之后用 restore 回到这一时刻或用 fork 从这一时刻分叉。
+        流式输入和直接写入磁盘的执行历史无法复制, 此时抛出ValueError。
+        """
+        if self._stream is not None:
+            raise ValueError("流式输入的模拟不能保存快照")
+        return pickle.dumps(self._saved_state(), pickle.HIGHEST_PROTOCOL)
+
+    def restore(self, snapshot):
+        """回到 snapshot 保存时的状态, 调度器和在线统计也替换为快照中的副本"""
+        self._load_state(pickle.loads(snapshot))
+        self._stream = None
+        self._stop_requested = False
+        self._tracing = self.trace.enabled
+
+    def fork(self, scheduler=None, snapshot=None, trace=None):
+        """
+        从快照复制出一个独立的模拟器, 可以换用另一个调度器继续运行 (用于比较不同调度策略)
+
+        Args:
+            scheduler: 继续运行使用的调度器 (新实例), None表示沿用快照中的调度器;
+                换用调度器时, 就绪进程按原队列顺序、阻塞进程连同剩余I/O时间一起移交,
+                调度器内部的时间片和老化计时从分叉时刻重新开始
+            snapshot: snapshot 返回的快照, 默认为当前状态
+            trace: 新模拟器的跟踪输出
+
+        Returns:
+            新的模拟器, 用 advance 和 finish 继续运行
+        """
+        if snapshot is None:
+            snapshot = self.snapshot()
+        simulator = copy.copy(self)
+        simulator.trace = trace or tracing.NullTraceSink()
+        simulator.restore(snapshot)
+        if scheduler is not None:
+            simulator._switch_scheduler(scheduler)
+        return simulator
+
+    def statistics(self):
+        """
+        已完成进程的平均等待时间、平均周转时间和平均响应时间
+
+        流式模式下包括运行中已释放的进程, total 为已到达的进程数。
+
+        Returns:
+            字典 {avg_waiting, avg_turnaround, avg_response, completed, total}
+        """
+        total_waiting_time = 0
+        total_turnaround_time = 0
+        total_response_time = 0
+        completed_count = 0
+        total = len(self.processes)
+        if self._stream is not None:
+            completed_count, total_waiting_time, total_turnaround_time, total_response_time = self._retired
+            total += self._retired[0]
+
+        for process in self.processes:
+            if process.state == PCB.TERMINATED:  # 仅考虑已完成的进程
+                completed_count += 1
+                total_turnaround_time += process.completion_time - process.arrival_time
+                total_waiting_time += process.waiting_time
+
+                # 响应时间是从到达到首次执行的时间
+                if process.execution_history:
+                    total_response_time += process.execution_history[0][0] - process.arrival_time
+
+        # 避免除零错误
+        if completed_count > 0:
+            avg_waiting = total_waiting_time / completed_count
+            avg_turnaround = total_turnaround_time / completed_count
+            avg_response = total_response_time / completed_count
+        else:
+            avg_waiting = avg_turnaround = avg_response = 0
+
+        return {'avg_waiting': avg_waiting, 'avg_turnaround': avg_turnaround,
+                'avg_response': avg_response, 'completed': completed_count,
+                'total': total}
+
+    def _reset_scheduler(self):
+        """清空调度器队列"""
+        self.scheduler.reset()
+
+    def _schedulers(self):
+        """模拟使用的所有调度器"""
+        return [self.scheduler]
+
+    def _sync_processes(self):
+        """把调度器惰性维护的等待时间和剩余I/O时间写回进程"""
+        self.scheduler.settle_waiting()
+        for process in self.processes:
+            if process.state == PCB.BLOCKED:
+                # 阻塞进程的剩余I/O时间由调度器按完成时间计算
+                process.io_remaining = self.scheduler.io_remaining(process)
+
+    def _saved_state(self):
+        """snapshot 保存的状态"""
+        if isinstance(self.execution_history, TimelineFileWriter):
+            raise ValueError("执行历史不在内存中, 不能保存快照")
+        return {
+            'current_time': self.current_time,
+            'processes': self.processes,
+            'scheduler': self.scheduler,
+            'execution_history': self.execution_history,
+            'live_processes': self.live_processes,
+            'arrivals': self._arrivals,
+            'arrival_cursor': self._arrival_cursor,
+            'stats': self.stats,
+            'event_driven': self._event_driven,
+            'finished': self._finished,
+        }
+
+    def _load_state(self, state):
+        self.current_time = state['current_time']
+        self.processes = state['processes']
+        self.scheduler = state['scheduler']
+        self.execution_history = state['execution_history']
+        self.live_processes = state['live_processes']
+        self._arrivals = state['arrivals']
+        self._arrival_cursor = state['arrival_cursor']
+        self.stats = state['stats']
+        self._event_driven = state['event_driven']
+        self._finished = state['finished']
+
+    def _switch_scheduler(self, scheduler):
+        """换用另一个调度器, 移交现有调度器中的所有进程"""
+        scheduler.import_state(*self.scheduler.export_state())
+        self.scheduler = scheduler
+
+    def _admit_arrivals(self):
+        """把到达时间为当前时间的进程加入调度器"""
+        if self._stream is not None:
+            self._admit_streamed()
+            return
+        arrivals = self._arrivals
+        while self._arrival_cursor < len(arrivals) and arrivals[self._arrival_cursor].arrival_time <= self.current_time:
+            process = arrivals[self._arrival_cursor]
+            self._arrival_cursor += 1
+            if process.arrival_time == self.current_time:
+                self.scheduler.add_process(process)
+                if self._tracing:
+                    self.trace.emit(self.current_time, tracing.ARRIVE, process.pid)
+
+    def _admit_streamed(self):
+        """从进程流中取出到达时间为当前时间的进程"""
+        process = self._pending
+        while process is not None and process.arrival_time <= self.current_time:
+            if process.arrival_time < self.current_time:
+                raise ValueError(f"进程 {process.pid} 的到达时间 {process.arrival_time} 早于当前时间 "
+                                 f"{self.current_time}, 进程流必须按到达时间排序")
+            if process.color is None:
+                process.color = self.colors[(len(self._live) + self._retired[0]) % len(self.colors)]
+            self._live[process] = None
+            self.live_processes += 1
+            self.scheduler.add_process(process)
+            if self._tracing:
+                self.trace.emit(self.current_time, tracing.ARRIVE, process.pid)
+            process = self._pending = next(self._stream, None)
+
+    def _retire(self, process):
+        """流式模式下释放已终止的进程, 只保留统计合计"""
+        del self._live[process]
+        self.scheduler.terminated_processes.clear()
+        retired = self._retired
+        retired[0] += 1
+        retired[1] += process.waiting_time
+        retired[2] += process.completion_time - process.arrival_time
+        if process.execution_history:
+            retired[3] += process.execution_history[0][0] - process.arrival_time
+
+    def _next_arrival_delay(self):
+        """距下一个进程到达还有多少时间单位 (没有则返回None)"""
+        if self._stream is not None:
+            return self._pending.arrival_time - self.current_time if self._pending is not None else None
+        if self._arrival_cursor < len(self._arrivals):
+            return self._arrivals[self._arrival_cursor].arrival_time - self.current_time
+        return None
+
+    def _run_length(self, process, max_time):
+        """事件驱动模式下, 当前进程在下一个事件之前可以连续执行的时间单位数"""
+        limits = [process.remaining_time, max_time - self.current_time,
+                  process.time_to_next_io(),
+                  self._next_arrival_delay(),
+                  self.scheduler.next_unblock_delay(),
+                  self.scheduler.stable_ticks(process)]
+        return max(1, min(limit for limit in limits if limit is not None))
+
+    def _idle_length(self, max_time):
+        """事件驱动模式下, CPU在下一个事件之前保持空闲的时间单位数"""
+        if self.live_processes == 0 and self._next_arrival_delay() is None:
+            return 1
+        limits = [max_time - self.current_time,
+                  self._next_arrival_delay(),
+                  self.scheduler.next_unblock_delay()]
+        return max(1, min(limit for limit in limits if limit is not None))
+
+    def _skip_ticks(self, process, ticks):
+        """一次性推进 ticks 个没有事件发生的时间单位 (process 在这期间持续执行)"""
+        if ticks <= 0:
+            return
+        self.scheduler.unblock_processes(ticks)
+        self.scheduler.update_queues(ticks)
+        if process is not None:
+            self.scheduler.fast_forward(process, ticks)
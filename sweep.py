@@ -0,0 +1,313 @@
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from scheduler import FCFSScheduler, PriorityScheduler, DynamicPriorityScheduler, RoundRobinScheduler, SJFScheduler, \
+    SRTFScheduler, MLFQScheduler, CFSScheduler
+from result_cache import ResultCache, workload_digest
+from simulator import TaskSimulator
+
+# 调度器名称 -> (调度器类, 使用的参数)
+SCHEDULERS = {
+    'fcfs': (FCFSScheduler, ()),
+    'priority': (PriorityScheduler, ()),
+    'dynamic': (DynamicPriorityScheduler, ('aging_factor',)),
+    'rr': (RoundRobinScheduler, ('time_quantum',)),
+    'sjf': (SJFScheduler, ()),
+    'srtf': (SRTFScheduler, ()),
+    'mlfq': (MLFQScheduler, ('time_quantum', 'num_queues')),
+    'cfs': (CFSScheduler, ('target_latency', 'min_granularity')),
+}
+
+PARAMETERS = ('time_quantum', 'aging_factor', 'num_queues', 'target_latency', 'min_granularity')
+METRICS = ('avg_waiting', 'avg_turnaround', 'avg_response', 'completed', 'end_time')
+
+
+def build_grid(schedulers=tuple(SCHEDULERS), time_quanta=(2,), aging_factors=(3,), num_queues=(3,),
+               target_latencies=(16,), min_granularities=(2,), seeds=range(10)):
+    """
+    生成参数网格中的所有任务
+
+    每个调度器只展开它实际使用的参数, 其余参数为None, 避免重复运行相同的配置。
+
+    Returns:
+        任务列表, 每个任务为 (调度器名称, time_quantum, aging_factor, num_queues, target_latency,
+        min_granularity, seed)
+    """
+    values = {'time_quantum': time_quanta, 'aging_factor': aging_factors, 'num_queues': num_queues,
+              'target_latency': target_latencies, 'min_granularity': min_granularities}
+    tasks = []
+    for seed in seeds:
+        for name in schedulers:
+            used = SCHEDULERS[name][1]
+            combos = [{}]
+            for param in PARAMETERS:
+                if param in used:
+                    combos = [dict(combo, **{param: value}) for combo in combos for value in values[param]]
+            for combo in combos:
+                tasks.append((name,) + tuple(combo.get(param) for param in PARAMETERS) + (seed,))
+    return tasks
+
+
+def task_key(row):
+    """结果行或任务对应的唯一键 (用于断点续跑)"""
+    if isinstance(row, dict):
+        return (row['scheduler'],) + tuple(row.get(param) for param in PARAMETERS) + (row['seed'],)
+    return tuple(row)
+
+
+# 工作进程的全局状态, 由 _init_worker 在每个进程中设置一次
+_worker_config = None
+_worker_workloads = {}
+_worker_cache = None
+
+
+def _init_worker(config):
+    global _worker_config, _worker_workloads, _worker_cache
+    _worker_config = config
+    _worker_workloads = {}
+    _worker_cache = ResultCache(directory=config['cache_dir']) if config['cache_dir'] else None
+
+
+def _workload(seed):
+    """取得种子对应的工作负载, 同一工作进程内只生成一次"""
+    processes = _worker_workloads.get(seed)
+    if processes is None:
+        provided = _worker_config['workloads']
+        if provided is not None:
+            processes = provided[seed]
+        else:
+            random.seed(seed)
+            generator = TaskSimulator(None)
+            generator.create_random_processes(_worker_config['num_processes'],
+                                              **_worker_config['generator_kwargs'])
+            processes = generator.processes
+        _worker_workloads[seed] = processes
+    return processes
+
+
+def _run_task(task):
+    name, seed = task[0], task[-1]
+    params = dict(zip(PARAMETERS, task[1:-1]))
+    scheduler_class, used = SCHEDULERS[name]
+    scheduler = scheduler_class(**{param: params[param] for param in used})
+
+    simulator = TaskSimulator(scheduler)
+    simulator.processes = _workload(seed)
+    if _worker_cache is not None:
+        stats = _worker_cache.run_simulation(simulator, _worker_config['max_time'],
+                                             event_driven=_worker_config['event_driven'])
+    else:
+        simulator.run_simulation(_worker_config['max_time'], event_driven=_worker_config['event_driven'])
+        stats = simulator.statistics()
+
+    row = {'scheduler': name, **params, 'seed': seed}
+    row['avg_waiting'] = stats['avg_waiting']
+    row['avg_turnaround'] = stats['avg_turnaround']
+    row['avg_response'] = stats['avg_response']
+    row['completed'] = stats['completed']
+    row['end_time'] = simulator.current_time
+    return row
+
+
+def _run_chunk(chunk):
+    """在工作进程中运行一组任务"""
+    return [_run_task(task) for task in chunk]
+
+
+class SweepTable:
+    """按配置 (调度器和参数, 不含种子) 流式汇总结果的均值和标准差"""
+
+    def __init__(self):
+        self._stats = {}  # 配置 -> (次数, {指标: (均值, M2)})
+
+    def add(self, row):
+        key = task_key(row)[:-1]
+        count, moments = self._stats.get(key, (0, {metric: (0.0, 0.0) for metric in METRICS}))
+        count += 1
+        updated = {}
+        for metric in METRICS:
+            mean, m2 = moments[metric]
+            delta = row[metric] - mean
+            mean += delta / count
+            updated[metric] = (mean, m2 + delta * (row[metric] - mean))
+        self._stats[key] = (count, updated)
+
+    def rows(self):
+        """汇总表, 每个配置一行"""
+        result = []
+        for key in sorted(self._stats, key=lambda k: tuple((v is None, v) for v in k)):
+            count, moments = self._stats[key]
+            row = dict(zip(('scheduler',) + PARAMETERS, key))
+            row['runs'] = count
+            for metric in METRICS:
+                mean, m2 = moments[metric]
+                row[metric] = mean
+                row[metric + '_std'] = math.sqrt(m2 / (count - 1)) if count > 1 else 0.0
+            result.append(row)
+        return result
+
+
+class SweepRunner:
+    """
+    用进程池运行参数扫描
+
+    工作负载不随任务传递: 随机工作负载在工作进程中按种子生成并缓存,
+    自定义工作负载通过进程池初始化参数在每个工作进程中只传递一次。
+    同一种子的任务被分在同一批, 结果逐批追加到 JSONL 文件, 中断后再次运行会跳过已完成的任务。
+    结果文件的第一行记录运行配置 (最大模拟时间和工作负载), 与本次配置不同时拒绝续跑。
+    """
+
+    def __init__(self, max_time=100, num_processes=10, generator_kwargs=None, workloads=None,
+                 results_path=None, max_workers=None, event_driven=True, cache_dir=None):
+        """
+        Args:
+            max_time: 每次模拟的最大时间
+            num_processes: 随机工作负载的进程数
+            generator_kwargs: 传给 create_random_processes 的其他参数
+            workloads: 自定义工作负载 {seed: PCB列表}, 提供时不再随机生成
+            results_path: 结果文件 (JSONL), 用于流式保存和断点续跑
+            max_workers: 工作进程数, 默认为CPU核数; 为1时在当前进程中运行
+            event_driven: 是否使用事件驱动模式运行模拟
+            cache_dir: 模拟结果的磁盘缓存目录 (result_cache.ResultCache), 工作进程之间以及
+                多次扫描之间共享, 工作负载和调度器配置相同的任务不再重新模拟
+        """
+        self.config = {'max_time': max_time, 'num_processes': num_processes,
+                       'generator_kwargs': generator_kwargs or {}, 'workloads': workloads,
+                       'event_driven': event_driven, 'cache_dir': cache_dir}
+        self.results_path = results_path
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.table = SweepTable()
+
+    def config_record(self):
+        """写在结果文件第一行的运行配置 (不含不影响结果的模拟模式和缓存目录)"""
+        workloads = self.config['workloads']
+        if workloads is not None:
+            workloads = {str(seed): workload_digest(processes) for seed, processes in sorted(workloads.items())}
+        record = {'max_time': self.config['max_time'], 'num_processes': self.config['num_processes'],
+                  'generator_kwargs': self.config['generator_kwargs'], 'workloads': workloads}
+        # 经过一次 JSON 转换, 与从文件读出的记录可以直接比较 (元组变为列表等)
+        return json.loads(json.dumps(record, sort_keys=True))
+
+    def completed_rows(self):
+        """
+        读取结果文件中已完成的结果
+
+        跳过中断时写了一半的行。配置记录与本次配置不同, 或文件中有结果但没有配置记录时抛出ValueError。
+        """
+        if not self.results_path or not os.path.exists(self.results_path):
+            return []
+        rows = []
+        config = None
+        with open(self.results_path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 中断时写了一半的行
+                if 'config' in record:
+                    config = record['config']
+                else:
+                    rows.append(record)
+        if (rows or config is not None) and config != self.config_record():
+            raise ValueError(f"结果文件 {self.results_path} 的运行配置与本次不同, 不能续跑")
+        return rows
+
+    def run(self, tasks, progress=None):
+        """
+        运行所有尚未完成的任务
+
+        Args:
+            tasks: build_grid 生成的任务列表
+            progress: 回调函数 progress(已完成数, 总数)
+
+        Returns:
+            SweepTable, 包含此前已完成和本次运行的全部结果
+        """
+        done = set()
+        for row in self.completed_rows():
+            done.add(task_key(row))
+            self.table.add(row)
+        pending = [task for task in tasks if task_key(task) not in done]
+        total = len(pending)
+        if not pending:
+            return self.table
+
+        chunks = self._chunks(pending)
+        out = self._open_results() if self.results_path else None
+        finished = 0
+        try:
+            if self.max_workers == 1:
+                _init_worker(self.config)
+                results = (_run_chunk(chunk) for chunk in chunks)
+                for rows in results:
+                    finished += self._collect(rows, out)
+                    if progress:
+                        progress(finished, total)
+            else:
+                with ProcessPoolExecutor(self.max_workers, initializer=_init_worker,
+                                         initargs=(self.config,)) as executor:
+                    futures = [executor.submit(_run_chunk, chunk) for chunk in chunks]
+                    try:
+                        for future in as_completed(futures):
+                            finished += self._collect(future.result(), out)
+                            if progress:
+                                progress(finished, total)
+                    except BaseException:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        raise
+        finally:
+            if out:
+                out.close()
+        return self.table
+
+    def _open_results(self):
+        """打开结果文件用于追加: 先去掉末尾写了一半的行, 新文件先写入配置记录"""
+        if os.path.exists(self.results_path):
+            _truncate_partial_line(self.results_path)
+        out = open(self.results_path, 'a', encoding='utf-8')
+        if out.tell() == 0:
+            out.write(json.dumps({'config': self.config_record()}, sort_keys=True) + '\n')
+        return out
+
+    def _chunks(self, tasks):
+        """按种子分组, 再切成大小适中的批次, 使每个工作进程有多个批次可以均衡负载"""
+        groups = {}
+        for task in tasks:
+            groups.setdefault(task[-1], []).append(task)
+        size = max(1, len(tasks) // (self.max_workers * 8))
+        chunks = []
+        for group in groups.values():
+            for start in range(0, len(group), size):
+                chunks.append(group[start:start + size])
+        return chunks
+
+    def _collect(self, rows, out):
+        for row in rows:
+            self.table.add(row)
+        if out:
+            out.write(''.join(json.dumps(row) + '\n' for row in rows))
+            out.flush()
+        return len(rows)
+
+
+def _truncate_partial_line(path):
+    """去掉文件末尾中断时写了一半的行 (最后一个换行符之后的内容)"""
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            step = min(pos, 1 << 16)
+            f.seek(pos - step)
+            newline = f.read(step).rfind(b'\n')
+            if newline >= 0:
+                pos = pos - step + newline + 1
+                break
+            pos -= step
+        if pos < end:
+            f.truncate(pos)
@@ -0,0 +1,251 @@
+import os
+import queue
+import struct
+import threading
+from array import array
+from bisect import bisect_right
+
+from pcb import PCB
+
+# 状态编码, 0 表示CPU空闲 (pid 和状态都为None)
+STATES = (None, PCB.READY, PCB.RUNNING, PCB.BLOCKED, PCB.TERMINATED)
+STATE_CODES = {state: code for code, state in enumerate(STATES)}
+
+# 二进制执行历史文件: 32 字节文件头 (魔数, 版本, 记录长度, 文件头长度), 之后是定长记录,
+# 每条记录为一段 (start, end, pid 均为 int64, 状态编码 int8, 补齐到 32 字节), 小端序。
+# 记录数由文件长度推出, 写入中途中断的文件也可以读取已写完的部分。
+MAGIC = b'SCHTRACE'
+VERSION = 1
+HEADER = struct.Struct('<8sIII12x')
+RECORD = struct.Struct('<qqqb7x')
+
+
+class ExecutionTimeline:
+    """
+    游程编码的执行历史
+
+    连续的、pid 和状态都相同的时间单位合并为一段 [start, end), 四个字段各存一列 array,
+    每段 33 字节 (含按时间单位定位用的偏移), 与运行时间的长短无关。追加时若与最后一段
+    首尾相接且 pid 和状态相同则直接延长, 否则新增一段, 两者都是 O(1)。
+
+    迭代、len() 和下标访问仍按时间单位展开成 (time, pid, state) 元组,
+    与原来的列表格式相同。
+    """
+
+    def __init__(self):
+        self.start = array('q')
+        self.end = array('q')
+        self.pid = array('q')
+        self.state = array('b')
+        self._offsets = array('q')  # 每段之前的时间单位总数
+        self._ticks = 0
+
+    def append(self, time, pid, state):
+        """追加一个时间单位"""
+        self.append_run(time, time + 1, pid, state)
+
+    def append_run(self, start, end, pid, state):
+        """追加 [start, end) 内 pid 和状态都相同的一段时间"""
+        if end <= start:
+            return
+        code = STATE_CODES[state]
+        pid = 0 if pid is None else pid
+        if self.end and self.end[-1] == start and self.state[-1] == code and self.pid[-1] == pid:
+            self.end[-1] = end
+        else:
+            self.start.append(start)
+            self.end.append(end)
+            self.pid.append(pid)
+            self.state.append(code)
+            self._offsets.append(self._ticks)
+        self._ticks += end - start
+
+    def segments(self):
+        """按时间顺序生成 (start, end, pid, state), 空闲段的 pid 和状态为None"""
+        for start, end, pid, code in zip(self.start, self.end, self.pid, self.state):
+            yield start, end, pid if code else None, STATES[code]
+
+    def segment_count(self):
+        return len(self.start)
+
+    def nbytes(self):
+        """各列占用的字节数"""
+        columns = (self.start, self.end, self.pid, self.state, self._offsets)
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def __len__(self):
+        return self._ticks
+
+    def __iter__(self):
+        for start, end, pid, state in self.segments():
+            for time in range(start, end):
+                yield time, pid, state
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self._ticks
+        if not 0 <= index < self._ticks:
+            raise IndexError("执行历史下标越界")
+        i = bisect_right(self._offsets, index) - 1
+        code = self.state[i]
+        return (self.start[i] + index - self._offsets[i], self.pid[i] if code else None, STATES[code])
+
+    def __eq__(self, other):
+        if isinstance(other, ExecutionTimeline):
+            return (self.start == other.start and self.end == other.end and
+                    self.pid == other.pid and self.state == other.state)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"ExecutionTimeline({self._ticks} ticks, {len(self.start)} segments)"
+
+
+class TimelineFileWriter:
+    """
+    把执行历史直接写入二进制文件, 接口与 ExecutionTimeline 的追加方法相同
+
+    最后一段保留在内存中以便继续延长, 其余的段按 batch_size 条一批打包写入。
+    background 为True时由后台线程写盘, 模拟循环只负责打包; 队列最多积压 max_pending 批,
+    写盘跟不上时模拟循环会等待, 内存占用有上限。
+    """
+
+    def __init__(self, path, batch_size=65536, background=False, max_pending=8):
+        self.path = path
+        self.batch_size = batch_size
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, HEADER.size))
+        self._batch = bytearray()
+        self._batched = 0
+        self._last = None  # 尚未写出的最后一段 [start, end, pid, code]
+        self._ticks = 0
+        self.segments_written = 0
+
+        self._queue = None
+        self._thread = None
+        self._error = None
+        if background:
+            self._queue = queue.Queue(max_pending)
+            self._thread = threading.Thread(target=self._write_loop, name='timeline-writer', daemon=True)
+            self._thread.start()
+
+    def append(self, time, pid, state):
+        """追加一个时间单位"""
+        self.append_run(time, time + 1, pid, state)
+
+    def append_run(self, start, end, pid, state):
+        """追加 [start, end) 内 pid 和状态都相同的一段时间"""
+        if end <= start:
+            return
+        code = STATE_CODES[state]
+        pid = 0 if pid is None else pid
+        last = self._last
+        if last is not None and last[1] == start and last[3] == code and last[2] == pid:
+            last[1] = end
+        else:
+            if last is not None:
+                self._add_record(last)
+            self._last = [start, end, pid, code]
+        self._ticks += end - start
+
+    def __len__(self):
+        return self._ticks
+
+    def _add_record(self, record):
+        self._batch += RECORD.pack(*record)
+        self._batched += 1
+        self.segments_written += 1
+        if self._batched >= self.batch_size:
+            self._write_batch()
+
+    def _write_batch(self):
+        if not self._batch:
+            return
+        data, self._batch, self._batched = bytes(self._batch), bytearray(), 0
+        if self._queue is None:
+            self.file.write(data)
+            return
+        if self._error is not None:
+            raise self._error
+        self._queue.put(data)
+
+    def _write_loop(self):
+        while True:
+            data = self._queue.get()
+            if data is None:
+                break
+            try:
+                if self._error is None:
+                    self.file.write(data)
+            except Exception as e:
+                self._error = e
+
+    def flush(self):
+        """写出除最后一段以外的所有段"""
+        self._write_batch()
+        if self._queue is None:
+            self.file.flush()
+
+    def close(self):
+        """写出所有段并关闭文件"""
+        if self.file.closed:
+            return
+        if self._last is not None:
+            self._add_record(self._last)
+            self._last = None
+        self._write_batch()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+        self.file.close()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _check_header(path):
+    with open(path, 'rb') as f:
+        magic, version, record_size, header_size = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"{path} 不是有效的执行历史文件")
+    count = (os.path.getsize(path) - header_size) // record_size
+    return header_size, count
+
+
+def open_timeline(path):
+    """
+    以 numpy.memmap 零拷贝打开执行历史文件 (需要安装 numpy)
+
+    返回结构化数组, 字段为 start, end, pid, state (状态编码见 STATES, 0 表示空闲)。
+    """
+    import numpy as np
+
+    header_size, count = _check_header(path)
+    dtype = np.dtype({'names': ['start', 'end', 'pid', 'state'],
+                      'formats': ['<i8', '<i8', '<i8', 'i1'],
+                      'offsets': [0, 8, 16, 24], 'itemsize': RECORD.size})
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=header_size, shape=(count,))
+
+
+def read_timeline(path, chunk_records=65536):
+    """不依赖 numpy, 逐段读取执行历史文件, 生成 (start, end, pid, state)"""
+    header_size, count = _check_header(path)
+    with open(path, 'rb') as f:
+        f.seek(header_size)
+        while count > 0:
+            data = f.read(min(count, chunk_records) * RECORD.size)
+            if not data:
+                break
+            count -= len(data) // RECORD.size
+            for start, end, pid, code in RECORD.iter_unpack(data):
+                yield start, end, pid if code else None, STATES[code]
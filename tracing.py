@@ -0,0 +1,150 @@
+import logging
+from collections import deque
+
+# 事件类型
+ARRIVE = "arrive"  # 进程到达
+RUN = "run"  # 进程执行一段时间, data = (开始时间, 剩余时间) 或多核模拟中的 (开始时间, 剩余时间, CPU)
+IDLE = "idle"  # CPU空闲一段时间, data = 开始时间
+IO_START = "io_start"  # 进程开始I/O
+TERMINATE = "terminate"  # 进程完成
+ALL_DONE = "all_done"  # 所有进程已完成
+END = "end"  # 模拟结束
+SUMMARY = "summary"  # 进程汇总, data = (执行历史, 完成时间, 优先级, 到达时间)
+MIGRATE = "migrate"  # 就绪进程迁移到另一个CPU, data = (原CPU, 新CPU)
+
+
+def format_event(time, event, pid=None, data=None):
+    """把跟踪事件格式化为一行文本"""
+    if event == ARRIVE:
+        return f"时间 {time}: 进程 {pid} 到达"
+    if event == RUN:
+        start, remaining = data[:2]
+        span = time if start == time else f"{start}-{time}"
+        cpu = f"CPU {data[2]} " if len(data) > 2 else ""
+        return f"时间 {span}: {cpu}执行进程 {pid}, 剩余时间: {remaining}"
+    if event == IDLE:
+        span = time if data == time else f"{data}-{time}"
+        return f"时间 {span}: CPU空闲"
+    if event == IO_START:
+        return f"时间 {time}: 进程 {pid} 开始I/O操作"
+    if event == TERMINATE:
+        return f"时间 {time}: 进程 {pid} 完成"
+    if event == MIGRATE:
+        return f"时间 {time}: 进程 {pid} 从 CPU {data[0]} 迁移到 CPU {data[1]}"
+    if event == ALL_DONE:
+        return "所有进程已完成"
+    if event == END:
+        return f"模拟结束, 总时间: {time}"
+    if event == SUMMARY:
+        history, completion_time, priority, arrival_time = data
+        line = f"进程 {pid}: 执行历史={history}, 完成时间={completion_time}"
+        if not history:
+            line += f"\n  注意: 进程 {pid} 未执行 (优先级:{priority}, 到达时间:{arrival_time})"
+        return line
+    return f"时间 {time}: {event} {pid} {data}"
+
+
+class TraceSink:
+    """
+    模拟过程跟踪输出的接口
+
+    enabled 为False时模拟器不会构造和发送任何事件。
+    """
+
+    enabled = True
+
+    def emit(self, time, event, pid=None, data=None):
+        """记录一个事件"""
+        raise NotImplementedError("子类必须实现emit方法")
+
+    def close(self):
+        """释放资源"""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class NullTraceSink(TraceSink):
+    """不记录任何事件 (批量运行时的默认选项)"""
+
+    enabled = False
+
+    def emit(self, time, event, pid=None, data=None):
+        pass
+
+
+class PrintTraceSink(TraceSink):
+    """逐条打印到标准输出"""
+
+    def emit(self, time, event, pid=None, data=None):
+        print(format_event(time, event, pid, data))
+
+
+class RingBufferTraceSink(TraceSink):
+    """在内存中保留最近的 capacity 条事件, 读取时才格式化"""
+
+    def __init__(self, capacity=10000):
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, time, event, pid=None, data=None):
+        self.records.append((time, event, pid, data))
+
+    def lines(self):
+        """格式化后的事件文本"""
+        return [format_event(*record) for record in self.records]
+
+
+class FileTraceSink(TraceSink):
+    """缓冲写入文本文件, 每攒够 batch_size 行写一次"""
+
+    def __init__(self, path, batch_size=4096):
+        self.file = open(path, "w", encoding="utf-8")
+        self.batch_size = batch_size
+        self._pending = []
+
+    def emit(self, time, event, pid=None, data=None):
+        self._pending.append(format_event(time, event, pid, data))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self.file.write("\n".join(self._pending) + "\n")
+            self._pending = []
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+class _LazyEvent:
+    """只有在 logging 真正输出时才格式化事件"""
+
+    __slots__ = ("record",)
+
+    def __init__(self, record):
+        self.record = record
+
+    def __str__(self):
+        return format_event(*self.record)
+
+
+class LoggingTraceSink(TraceSink):
+    """输出到 logging 模块, 日志级别未开启时视为禁用"""
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or logging.getLogger("simulator")
+        self.level = level
+
+    @property
+    def enabled(self):
+        return self.logger.isEnabledFor(self.level)
+
+    def emit(self, time, event, pid=None, data=None):
+        self.logger.log(self.level, "%s", _LazyEvent((time, event, pid, data)))
@@ -2,13 +2,14 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import numpy as np
 
+from gantt import GanttChart, io_periods
+
 class SchedulerVisualizer:
     """Visualization for process scheduling simulation."""
     
     def __init__(self, simulator):
         self.simulator = simulator
         self.processes = simulator.processes
-        self.execution_log = simulator.execution_log
     
     def visualize_gantt_chart(self, title="Process Scheduling Simulation"):
         """Create a Gantt chart visualization of process execution."""
@@ -31,24 +32,8 @@ class SchedulerVisualizer:
                 # Generate a distinct color for each process
                 process_colors[process.pid] = plt.cm.tab10(i % 10)
         
-        # Extract continuous execution periods for each process
-        execution_periods = {}
-        for i in range(len(self.execution_log) - 1):
-            time, pid, status = self.execution_log[i]
-            next_time = self.execution_log[i + 1][0]
-            
-            if status == "run":
-                if pid not in execution_periods:
-                    execution_periods[pid] = []
-                execution_periods[pid].append((time, next_time))
-        
-        # Add last execution period if needed
-        if len(self.execution_log) > 0:
-            last_time, last_pid, last_status = self.execution_log[-1]
-            if last_status == "run" and last_pid in execution_periods:
-                execution_periods[last_pid].append((last_time, last_time + 1))
-        
-        # Plot execution periods
+        # One collection per process row; sub-pixel segments are merged when zoomed out
+        gantt = self.gantt = GanttChart(ax)
         y_ticks = []
         y_labels = []
         
@@ -57,19 +42,13 @@ class SchedulerVisualizer:
             y_ticks.append(y_pos)
             y_labels.append(f"P{process.pid}")
             
-            if process.pid in execution_periods:
-                for start, end in execution_periods[process.pid]:
-                    ax.barh(y_pos, end - start, left=start, height=0.5, 
-                           color=process_colors[process.pid], alpha=0.75)
-        
-        # Plot I/O periods
-        for process in self.processes:
-            y_pos = len(self.processes) - self.processes.index(process)
+            # Plot execution periods
+            gantt.add_row(y_pos, process.execution_history, height=0.5,
+                          facecolors=process_colors[process.pid], alpha=0.75)
             
-            for start, end, status in process.execution_history:
-                if status == "blocked":
-                    ax.barh(y_pos, end - start, left=start, height=0.5,
-                           color='red', alpha=0.6)
+            # Plot I/O periods
+            gantt.add_row(y_pos, io_periods(process), height=0.5,
+                          facecolors='red', alpha=0.6)
         
         # Set chart properties
         ax.set_yticks(y_ticks)
@@ -78,6 +57,9 @@ class SchedulerVisualizer:
         ax.set_ylabel("Process")
         ax.grid(True, axis='x', linestyle='--', alpha=0.7)
         ax.set_title(title)
+        ax.set_ylim(0, len(self.processes) + 1)
+        end_time = max((p.execution_history[-1][1] for p in self.processes if p.execution_history), default=0)
+        ax.set_xlim(0, max(end_time, self.simulator.current_time) + 1)
         
         # Add legend for process states
         legend_handles = [
@@ -89,10 +71,12 @@ class SchedulerVisualizer:
         # Add statistics text
         stats_text = "Process Statistics:\n"
         for process in self.processes:
-            stats_text += f"P{process.pid}: Turnaround={process.turnaround_time}, Waiting={process.waiting_time}\n"
+            turnaround = process.completion_time - process.arrival_time if process.completion_time else None
+            stats_text += f"P{process.pid}: Turnaround={turnaround}, Waiting={process.waiting_time}\n"
         
         plt.figtext(0.02, 0.02, stats_text, fontsize=9, 
                    bbox=dict(facecolor='white', alpha=0.8))
         
         plt.tight_layout()
+        gantt.refresh()
         return fig
\ No newline at end of file
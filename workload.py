@@ -0,0 +1,129 @@
+import csv
+import json
+import mmap
+import os
+
+from pcb import PCB
+
+# CSV 轨迹文件的列, io_times 写作 "执行时间:持续时间;..." (没有I/O时为空)
+CSV_FIELDS = ('pid', 'priority', 'burst_time', 'arrival_time', 'io_times')
+
+# 不使用内存映射时每次读取的字节数
+CHUNK_SIZE = 1 << 20
+
+
+def iter_lines(path, use_mmap=True, chunk_size=CHUNK_SIZE):
+    """
+    逐行读取文件 (bytes, 不含换行符)
+
+    默认把文件映射到内存, 由操作系统按需换入页面, 多GB的文件也只占用很少的常驻内存。
+    文件不能映射时 (空文件、管道、32位平台上的超大文件) 改为按 chunk_size 分块读取。
+    """
+    with open(path, 'rb') as f:
+        if use_mmap:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError, OverflowError):
+                mapped = None
+            if mapped is not None:
+                with mapped:
+                    for line in iter(mapped.readline, b''):
+                        yield line.rstrip(b'\r\n')
+                return
+
+        pending = b''
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line.rstrip(b'\r')
+        if pending:
+            yield pending.rstrip(b'\r')
+
+
+def parse_io_times(text):
+    """把 "3:2;7:1" 解析为 {3: 2, 7: 1}"""
+    io_times = {}
+    for item in text.split(';'):
+        item = item.strip()
+        if item:
+            point, duration = item.split(':')
+            io_times[int(point)] = int(duration)
+    return io_times
+
+
+def format_io_times(io_times):
+    """把 {3: 2, 7: 1} 格式化为 "3:2;7:1" """
+    return ';'.join(f"{point}:{duration}" for point, duration in sorted(io_times.items()))
+
+
+def read_csv(path, use_mmap=True, chunk_size=CHUNK_SIZE):
+    """
+    从CSV轨迹文件逐个生成PCB
+
+    第一行为列名 (见 CSV_FIELDS, 顺序不限, io_times 和 arrival_time 可以省略)。
+    进程必须按到达时间排序, 才能交给 TaskSimulator.stream_processes 使用。
+    """
+    lines = (line.decode('utf-8') for line in iter_lines(path, use_mmap, chunk_size))
+    reader = csv.DictReader(lines)
+    for line_number, row in enumerate(reader, 2):
+        try:
+            yield PCB(int(row['pid']), int(row['priority']), int(row['burst_time']),
+                      parse_io_times(row.get('io_times') or ''), int(row.get('arrival_time') or 0))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"{path} 第 {line_number} 行格式错误: {e}") from e
+
+
+def read_jsonl(path, use_mmap=True, chunk_size=CHUNK_SIZE):
+    """
+    从JSONL轨迹文件逐个生成PCB
+
+    每行一个对象, 字段同 CSV_FIELDS; io_times 可以是 {"3": 2} 或 [[3, 2]]。
+    进程必须按到达时间排序。
+    """
+    for line_number, line in enumerate(iter_lines(path, use_mmap, chunk_size), 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            io_times = record.get('io_times') or {}
+            if isinstance(io_times, dict):
+                io_times = io_times.items()
+            yield PCB(int(record['pid']), int(record['priority']), int(record['burst_time']),
+                      {int(point): int(duration) for point, duration in io_times},
+                      int(record.get('arrival_time', 0)))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"{path} 第 {line_number} 行格式错误: {e}") from e
+
+
+def read_trace(path, **kwargs):
+    """按扩展名 (.csv 或 .jsonl) 选择读取方式"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return read_csv(path, **kwargs)
+    if extension in ('.jsonl', '.ndjson'):
+        return read_jsonl(path, **kwargs)
+    raise ValueError(f"不支持的轨迹文件格式: {path}")
+
+
+def write_csv(processes, path):
+    """把进程按到达时间排序后写成CSV轨迹文件"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        for process in sorted(processes, key=lambda p: p.arrival_time):
+            writer.writerow((process.pid, process.static_priority, process.burst_time,
+                             process.arrival_time, format_io_times(process.io_times)))
+
+
+def write_jsonl(processes, path):
+    """把进程按到达时间排序后写成JSONL轨迹文件"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for process in sorted(processes, key=lambda p: p.arrival_time):
+            record = {'pid': process.pid, 'priority': process.static_priority,
+                      'burst_time': process.burst_time, 'arrival_time': process.arrival_time,
+                      'io_times': sorted(process.io_times.items())}
+            f.write(json.dumps(record) + '\n')
@@ -0,0 +1,138 @@
+import numpy as np
+
+from process_table import ProcessTable
+
+ARRIVALS = ('uniform', 'exponential')
+BURSTS = ('uniform', 'exponential', 'pareto')
+IO_PATTERNS = ('uniform', 'bursty')
+
+
+class WorkloadGenerator:
+    """
+    可复现的向量化工作负载生成器
+
+    使用独立的 numpy.random.Generator (不影响也不依赖全局 random 状态),
+    同一个种子和参数总是生成相同的工作负载。所有字段按列整批生成,
+    I/O 点按 CSR 格式生成和去重, 直接构造 process_table.ProcessTable,
+    10^6 个进程约需 0.2 到 0.5 秒。默认参数的分布与 TaskSimulator.create_random_processes 相同。
+
+    分布:
+        到达时间 arrival: 'uniform' 在 [0, max_arrival] 内均匀分布;
+            'exponential' 为泊松到达, 相邻到达的间隔服从均值为 mean_interarrival 的指数分布
+        执行时间 burst: 'uniform' 在 [min_burst, max_burst] 内均匀分布;
+            'exponential' 为 min_burst 加上均值为 mean_burst - min_burst 的指数分布;
+            'pareto' 为下限 min_burst、形状参数 burst_shape 的帕累托分布 (重尾, 形状越小尾部越重)。
+            所有分布都截断在 max_burst
+        I/O io: 'uniform' 每个进程 0 到 max_io_ops 个I/O点, 在执行期间均匀分布;
+            'bursty' 每个进程的I/O点成簇出现, 簇数服从均值为 io_clusters 的泊松分布,
+            每簇的I/O点数服从均值为 io_cluster_size 的几何分布, 簇内相邻I/O点间隔 1 到 io_gap。
+            I/O 持续时间在 [1, max_io_duration] 内均匀分布
+    """
+
+    def __init__(self, seed=None, arrival='uniform', burst='uniform', io='uniform',
+                 max_arrival=10, mean_interarrival=1.0,
+                 min_burst=5, max_burst=20, mean_burst=None, burst_shape=1.5,
+                 max_priority=10, max_io_ops=3, max_io_duration=5,
+                 io_clusters=1.0, io_cluster_size=3.0, io_gap=2):
+        """
+        Args:
+            seed: 随机种子 (整数或 numpy.random.SeedSequence), None表示每次不同
+            arrival, burst, io: 分布名称, 见类说明
+            mean_burst: 'exponential' 执行时间的均值, 默认为 (min_burst + max_burst) / 2
+            其余参数见类说明
+        """
+        if arrival not in ARRIVALS:
+            raise ValueError(f"不支持的到达分布: {arrival}")
+        if burst not in BURSTS:
+            raise ValueError(f"不支持的执行时间分布: {burst}")
+        if io not in IO_PATTERNS:
+            raise ValueError(f"不支持的I/O模式: {io}")
+        if not 1 <= min_burst <= max_burst:
+            raise ValueError("执行时间范围无效")
+        self.rng = np.random.default_rng(seed)
+        self.arrival = arrival
+        self.burst = burst
+        self.io = io
+        self.max_arrival = max_arrival
+        self.mean_interarrival = mean_interarrival
+        self.min_burst = min_burst
+        self.max_burst = max_burst
+        self.mean_burst = mean_burst if mean_burst is not None else (min_burst + max_burst) / 2
+        self.burst_shape = burst_shape
+        self.max_priority = max_priority
+        self.max_io_ops = max_io_ops
+        self.max_io_duration = max_io_duration
+        self.io_clusters = io_clusters
+        self.io_cluster_size = io_cluster_size
+        self.io_gap = io_gap
+
+    def table(self, num_processes, first_pid=1):
+        """生成 num_processes 个进程, 返回 ProcessTable (pid 从 first_pid 开始连续编号)"""
+        n = num_processes
+        pid = np.arange(first_pid, first_pid + n, dtype=np.int64)
+        burst = self._bursts(n)
+        priority = self.rng.integers(1, self.max_priority + 1, n)
+        arrival = self._arrivals(n)
+        io_offsets, io_points, io_durations = self._io(burst)
+        return ProcessTable.from_columns(pid, priority, burst, arrival, io_offsets, io_points, io_durations)
+
+    def processes(self, num_processes, first_pid=1):
+        """生成 num_processes 个独立的PCB对象 (进程数很大时使用 table 更快、更省内存)"""
+        table = self.table(num_processes, first_pid)
+        return [table.to_pcb(index) for index in range(len(table))]
+
+    def _arrivals(self, n):
+        if self.arrival == 'uniform':
+            return self.rng.integers(0, self.max_arrival + 1, n)
+        gaps = self.rng.exponential(self.mean_interarrival, n)
+        return np.floor(np.cumsum(gaps)).astype(np.int64)
+
+    def _bursts(self, n):
+        rng = self.rng
+        if self.burst == 'uniform':
+            return rng.integers(self.min_burst, self.max_burst + 1, n)
+        if self.burst == 'exponential':
+            values = self.min_burst + rng.exponential(max(self.mean_burst - self.min_burst, 0), n)
+        else:
+            values = self.min_burst * (1 + rng.pareto(self.burst_shape, n))
+        return np.minimum(np.floor(values), self.max_burst).astype(np.int64)
+
+    def _io(self, burst):
+        """生成 CSR 格式的I/O点 (io_offsets, io_points, io_durations)"""
+        rng = self.rng
+        n = len(burst)
+        # 执行时间为1的进程没有可以放置I/O的位置
+        has_room = burst > 1
+        if self.io == 'uniform':
+            counts = rng.integers(0, self.max_io_ops + 1, n) * has_room
+            owner = np.repeat(np.arange(n), counts)
+            points = 1 + np.floor(rng.random(len(owner)) * (burst[owner] - 1)).astype(np.int64)
+        else:
+            clusters = rng.poisson(self.io_clusters, n) * has_room
+            cluster_owner = np.repeat(np.arange(n), clusters)
+            starts = 1 + np.floor(rng.random(len(cluster_owner)) * (burst[cluster_owner] - 1)).astype(np.int64)
+            sizes = rng.geometric(1 / max(self.io_cluster_size, 1), len(cluster_owner))
+            cluster = np.repeat(np.arange(len(cluster_owner)), sizes)
+            # 簇内偏移: 间隔的分段累加和, 每簇第一个点的间隔为0
+            gaps = rng.integers(1, self.io_gap + 1, len(cluster))
+            first = np.cumsum(sizes) - sizes
+            gaps[first] = 0
+            total = np.cumsum(gaps)
+            offsets = total - total[first][cluster]
+            owner = cluster_owner[cluster]
+            points = starts[cluster] + offsets
+            inside = points < burst[owner]
+            owner, points = owner[inside], points[inside]
+        durations = rng.integers(1, self.max_io_duration + 1, len(owner))
+
+        # 按 (进程, 执行时间) 排序并去掉同一进程的重复I/O点
+        keys = owner * (int(burst.max(initial=1)) + 1) + points
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = keys[1:] != keys[:-1]
+        order = order[keep]
+        owner, points, durations = owner[order], points[order], durations[order]
+        io_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owner, minlength=n), out=io_offsets[1:])
+        return io_offsets, points, durations